@@ -4,7 +4,27 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import queue
 import sys
+from collections.abc import Callable
+from logging.handlers import QueueHandler, QueueListener
+
+
+def _loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return uvloop's loop factory when available (optional ``fast`` extra).
+
+    uvloop is a libuv-backed drop-in event loop with lower per-callback
+    overhead. Falls back to the stock asyncio loop if not installed or on
+    Windows, where uvloop is unsupported.
+    """
+    if sys.platform == "win32":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
 
 
 def main() -> None:
@@ -17,16 +37,27 @@ def main() -> None:
         print("Copy .env.example to .env and fill in your values.", file=sys.stderr)
         sys.exit(1)
 
-    # Setup logging — both stderr and file
+    # Setup logging — both stderr and file (the file is kept for persistent
+    # debugging). Both handlers run on a QueueListener thread so neither tty
+    # nor disk writes block the event loop — the root logger only enqueues.
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
-    fmt = "%(asctime)s [%(name)s] %(levelname)s: %(message)s"
-    logging.basicConfig(format=fmt, level=log_level)
-
-    # Also log to file for persistent debugging
+    formatter = logging.Formatter("%(asctime)s [%(name)s] %(levelname)s: %(message)s")
+    stream_handler = logging.StreamHandler()
     file_handler = logging.FileHandler("/tmp/metroclaude.log")
-    file_handler.setFormatter(logging.Formatter(fmt))
-    file_handler.setLevel(log_level)
-    logging.getLogger().addHandler(file_handler)
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+        handler.setLevel(log_level)
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(QueueHandler(log_queue))
+    log_listener = QueueListener(
+        log_queue,
+        stream_handler,
+        file_handler,
+        respect_handler_level=True,
+    )
+    log_listener.start()
 
     # Quiet noisy libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -36,6 +67,14 @@ def main() -> None:
 
     logger = logging.getLogger("metroclaude")
     logger.info("MetroClaude v0.1.0 starting...")
+
+    if settings.cpu_affinity_core is not None:
+        try:
+            os.sched_setaffinity(0, {settings.cpu_affinity_core})
+            logger.info("Pinned to CPU core %d", settings.cpu_affinity_core)
+        except (AttributeError, OSError) as e:
+            # AttributeError: not available on macOS/Windows
+            logger.warning("Could not set CPU affinity: %s", e)
     logger.info("Working dir: %s", settings.working_dir)
     logger.info("Allowed users: %s", settings.allowed_users)
 
@@ -57,10 +96,18 @@ def main() -> None:
     from .bot import MetroClaudeBot
 
     bot = MetroClaudeBot()
+    loop_factory = _loop_factory()
+    if loop_factory:
+        logger.info("Using uvloop event loop")
+    else:
+        logger.info("uvloop unavailable, using the default asyncio event loop")
     try:
-        asyncio.run(bot.run())
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(bot.run())
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
+    finally:
+        log_listener.stop()  # Drains pending records to the file
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-"""Main Telegram bot — long polling, routing, and JSONL event dispatch.
+"""Main Telegram bot — polling/webhook intake, routing, and JSONL event dispatch.
 
 This is the central coordinator:
 - Registers Telegram handlers (commands, messages, callbacks)
@@ -9,16 +9,26 @@ This is the central coordinator:
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import re
+import signal
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from telegram import Update
+from telegram import Bot, Update
+from telegram.error import BadRequest
 from telegram.ext import (
     Application,
+    ApplicationHandlerStop,
     CallbackQueryHandler,
     CommandHandler,
     ContextTypes,
     MessageHandler,
+    TypeHandler,
     filters,
 )
 
@@ -27,6 +37,7 @@ from .handlers.callback_data import (
     CB_ASKUSER,
     CB_REFRESH,
     CB_RESTART,
+    CB_RESUME,
     PREFIX_TO_TMUX_KEY,
     decode_callback,
 )
@@ -55,39 +66,131 @@ from .security.audit import AuditLogger
 from .security.rate_limiter import RateLimiter
 from .session import SessionManager
 from .tmux import TmuxManager
+from .utils.batcher import MessageBatcher
 from .utils.markdown import to_telegram
 from .utils.queue import MessageQueue, MessageTask, TaskType
 
 logger = logging.getLogger(__name__)
 
+# Status polling (seconds): tick for dirty windows, how long a window stays
+# dirty after JSONL activity, full-pass backstop, and stale-session cleanup
+_STATUS_POLL_INTERVAL = 2.0
+_DIRTY_WINDOW_TTL = 10.0
+_STATUS_POLL_BACKSTOP = 10.0
+_STALE_CHECK_INTERVAL = 30.0
+
+# Backstop checks slow down for windows with no JSONL activity: the interval
+# doubles for every _IDLE_BACKOFF_STEP seconds idle, up to _IDLE_BACKOFF_MAX.
+_IDLE_BACKOFF_STEP = 60.0
+_IDLE_BACKOFF_MAX = 30.0
+
+# Number of recent update_ids remembered for duplicate detection
+_SEEN_UPDATES_MAX = 512
+
+# Tool uses awaiting their result; oldest are evicted past this cap
+_PENDING_TOOLS_MAX = 4096
+
+# Separator between coalesced assistant text blocks (one paragraph each)
+_TEXT_JOIN = "\n\n"
+
+# getUpdates long-polling timeout (seconds)
+_POLL_TIMEOUT = 30
+
+# Terminal tail shown by the Refresh button (room left for the code fence).
+# capture_pane only grabs the visible screen, so the buffer is a few KB at
+# most; when it already fits, the slice returns the same str without copying.
+_REFRESH_TAIL_CHARS = 3900
+
+# Update kinds the registered handlers consume (commands, text, forum
+# service messages and inline buttons); Telegram filters out the rest.
+_ALLOWED_UPDATES = [Update.MESSAGE, Update.EDITED_MESSAGE, Update.CALLBACK_QUERY]
+
+# Legacy callback formats, still accepted for buttons already in chat history:
+# "resume:<session_id>" and "permit:<yes|no>[:<window>]"
+_RESUME_CB_RE = re.compile(r"^resume:(.+)$")
+_PERMIT_CB_RE = re.compile(r"^permit:([^:]*):?([^:]*)")
+
 
 class MetroClaudeBot:
     """The main bot orchestrator."""
 
+    __slots__ = (
+        "_settings",
+        "_claude_command",
+        "_session_mgr",
+        "_tmux_mgr",
+        "_monitor",
+        "_app",
+        "_bot",
+        "_queue",
+        "_typing",
+        "_rate_limiter",
+        "_audit",
+        "_interactive_tracker",
+        "_poll_task",
+        "_poll_wakeup",
+        "_dirty_windows",
+        "_last_activity",
+        "_last_checked",
+        "_loop",
+        "_dispatch_tasks",
+        "_seen_updates",
+        "_stop_event",
+        "_fmt_pool",
+        "_pending_tools",
+        "_cb_dispatch",
+    )
+
     def __init__(self) -> None:
         self._settings = get_settings()
+        self._claude_command = self._settings.claude_command
         self._session_mgr = SessionManager()
         self._tmux_mgr = TmuxManager()
         self._monitor = MonitorPool()
         self._app: Application | None = None
+        self._bot: Bot | None = None  # Shortcut to self._app.bot for the send path
         self._queue: MessageQueue | None = None
         self._typing: TypingManager | None = None
         self._rate_limiter = RateLimiter()
         self._audit = AuditLogger()
         self._interactive_tracker: InteractiveTracker | None = None
         self._poll_task: asyncio.Task | None = None
-        # P1-M1: Pending tool_use events keyed by tool_id → formatted display text
-        self._pending_tools: dict[str, str] = {}
+        # Status loop wakeups: window_name -> monotonic deadline for re-checks
+        self._poll_wakeup = asyncio.Event()
+        self._dirty_windows: dict[str, float] = {}
+        # window_name -> monotonic time of last JSONL output / last backstop check
+        self._last_activity: dict[str, float] = {}
+        self._last_checked: dict[str, float] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._dispatch_tasks: set[asyncio.Task] = set()
+        self._seen_updates: OrderedDict[int, None] = OrderedDict()
+        self._stop_event = asyncio.Event()
+        self._fmt_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metroclaude-fmt")
+        # P1-M1: Pending tool_use events keyed by tool_id → (claude session, display text)
+        self._pending_tools: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        # Callback prefix -> handler(query, window_name, index)
+        self._cb_dispatch: dict[str, Callable[..., Awaitable[None]]] = {
+            CB_RESUME: self._handle_resume_cb,
+            CB_ASKUSER: self._handle_askuser_cb,
+            CB_RESTART: self._handle_restart_cb,
+            CB_REFRESH: self._handle_refresh_cb,
+            **{
+                p: functools.partial(self._handle_yesno_cb, k)
+                for p, k in PREFIX_TO_TMUX_KEY.items()
+            },
+        }
 
     async def run(self) -> None:
         """Build and start the bot."""
         logger.info("Starting MetroClaude bot...")
+        self._loop = asyncio.get_running_loop()
 
         # Register Claude Code SessionStart hook (pattern from ccbot)
         register_hook()
 
         # Build Telegram application
         self._app = Application.builder().token(self._settings.telegram_bot_token).build()
+        self._bot = self._app.bot
 
         # Store shared objects in bot_data
         self._app.bot_data["session_manager"] = self._session_mgr
@@ -95,6 +198,7 @@ class MetroClaudeBot:
         self._app.bot_data["monitor_pool"] = self._monitor
         self._app.bot_data["rate_limiter"] = self._rate_limiter
         self._app.bot_data["audit"] = self._audit
+        self._app.bot_data["blocked_commands"] = self._settings.blocked_commands
 
         # Message queue for rate-limited sending (send + edit + delete)
         self._queue = MessageQueue(
@@ -104,6 +208,9 @@ class MetroClaudeBot:
         )
         self._app.bot_data["message_queue"] = self._queue
 
+        # Batch bursts of user messages into one tmux send per window
+        self._app.bot_data["message_batcher"] = MessageBatcher(self._tmux_mgr.send_message)
+
         # Typing manager
         self._typing = TypingManager(self._app.bot)
         self._app.bot_data["typing_manager"] = self._typing
@@ -127,24 +234,64 @@ class MetroClaudeBot:
         # Start status polling (detect permissions, exits)
         self._poll_task = asyncio.create_task(self._status_poll_loop())
 
-        # Start Telegram polling
-        logger.info("Bot ready — starting Telegram polling")
+        # Start receiving Telegram updates (webhook if configured, else polling)
         await self._app.initialize()
         await self._app.start()
-        await self._app.updater.start_polling(
-            allowed_updates=Update.ALL_TYPES,
-            drop_pending_updates=True,
-        )
+        if self._settings.webhook_url:
+            await self._start_webhook()
+        else:
+            logger.info("Bot ready — starting Telegram polling")
+            # Long poll (30s server-side wait) — one getUpdates per idle
+            # half-minute. Pending updates are kept so a restart doesn't lose
+            # messages or button presses sent while the bot was down.
+            await self._app.updater.start_polling(
+                timeout=_POLL_TIMEOUT,
+                allowed_updates=_ALLOWED_UPDATES,
+                drop_pending_updates=False,
+            )
 
-        # Keep running until interrupted
+        # Keep running until SIGINT/SIGTERM sets the stop event.
+        # Signal handlers aren't available on Windows — there, Ctrl+C makes
+        # asyncio.Runner cancel this task; shutdown still runs below and the
+        # cancellation propagates back to the runner (KeyboardInterrupt).
+        signals = (signal.SIGINT, signal.SIGTERM)
         try:
-            stop_event = asyncio.Event()
-            await stop_event.wait()  # Runs forever
-        except (KeyboardInterrupt, asyncio.CancelledError):
-            pass
+            for sig in signals:
+                self._loop.add_signal_handler(sig, self._stop_event.set)
+        except NotImplementedError:
+            signals = ()
+        try:
+            await self._stop_event.wait()
         finally:
+            for sig in signals:
+                self._loop.remove_signal_handler(sig)
             await self.shutdown()
 
+    async def _start_webhook(self) -> None:
+        """Receive updates via webhook — Telegram pushes them to us.
+
+        The token is used as the URL path so only Telegram knows the full
+        endpoint; ``webhook_secret`` adds header-based verification on top.
+        Requires the ``python-telegram-bot[webhooks]`` extra.
+        """
+        settings = self._settings
+        url_path = settings.telegram_bot_token
+        webhook_url = settings.webhook_url.rstrip("/") + "/" + url_path
+        logger.info(
+            "Bot ready — starting Telegram webhook on %s:%d",
+            settings.webhook_listen,
+            settings.webhook_port,
+        )
+        await self._app.updater.start_webhook(
+            listen=settings.webhook_listen,
+            port=settings.webhook_port,
+            url_path=url_path,
+            webhook_url=webhook_url,
+            secret_token=settings.webhook_secret or None,
+            allowed_updates=_ALLOWED_UPDATES,
+            drop_pending_updates=False,
+        )
+
     async def shutdown(self) -> None:
         """Graceful shutdown."""
         logger.info("Shutting down MetroClaude...")
@@ -161,6 +308,7 @@ class MetroClaudeBot:
             await self._app.updater.stop()
             await self._app.stop()
             await self._app.shutdown()
+        self._fmt_pool.shutdown(wait=False, cancel_futures=True)
         logger.info("MetroClaude stopped.")
 
     # ------------------------------------------------------------------
@@ -172,22 +320,46 @@ class MetroClaudeBot:
         if not app:
             return
 
-        # Commands
-        app.add_handler(CommandHandler("start", cmd_start))
-        app.add_handler(CommandHandler("new", cmd_new))
-        app.add_handler(CommandHandler("stop", cmd_stop))
-        app.add_handler(CommandHandler("status", cmd_status))
-        app.add_handler(CommandHandler("resume", cmd_resume))
-        app.add_handler(CommandHandler("screenshot", cmd_screenshot))
+        # Drop redelivered updates before any handler runs (group -1 runs
+        # first; blocking so ApplicationHandlerStop halts later groups)
+        app.add_handler(TypeHandler(Update, self._dedup_update), group=-1)
 
-        # Callback queries (inline keyboards)
-        app.add_handler(CallbackQueryHandler(self._handle_callback))
+        # block=False: PTB runs each handler as its own task, so a slow tmux
+        # round-trip in one topic doesn't hold up updates for the others.
+        # Composite tmux sends are serialized per window in TmuxManager.
+
+        # Commands
+        app.add_handler(CommandHandler("start", cmd_start, block=False))
+        app.add_handler(CommandHandler("new", cmd_new, block=False))
+        app.add_handler(CommandHandler("stop", cmd_stop, block=False))
+        app.add_handler(CommandHandler("status", cmd_status, block=False))
+        app.add_handler(CommandHandler("resume", cmd_resume, block=False))
+        app.add_handler(CommandHandler("screenshot", cmd_screenshot, block=False))
+
+        # Callback queries (inline keyboards) — legacy formats are routed by
+        # PTB's pattern match before the unified handler sees them
+        app.add_handler(
+            CallbackQueryHandler(
+                self._handle_resume_callback,
+                pattern=_RESUME_CB_RE,
+                block=False,
+            )
+        )
+        app.add_handler(
+            CallbackQueryHandler(
+                self._handle_legacy_permit_callback,
+                pattern=_PERMIT_CB_RE,
+                block=False,
+            )
+        )
+        app.add_handler(CallbackQueryHandler(self._handle_callback, block=False))
 
         # Text messages (non-commands)
         app.add_handler(
             MessageHandler(
                 filters.TEXT & ~filters.COMMAND,
                 handle_text_message,
+                block=False,
             )
         )
 
@@ -196,6 +368,7 @@ class MetroClaudeBot:
             MessageHandler(
                 filters.COMMAND,
                 handle_forward_command,
+                block=False,
             )
         )
 
@@ -204,11 +377,26 @@ class MetroClaudeBot:
             MessageHandler(
                 filters.StatusUpdate.FORUM_TOPIC_CLOSED,
                 self._handle_topic_closed,
+                block=False,
             )
         )
 
         logger.info("Handlers registered")
 
+    async def _dedup_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Stop processing of an update_id that was already handled.
+
+        Telegram can redeliver an update; without this, a button press would
+        send its tmux keys twice. Remembers the last _SEEN_UPDATES_MAX ids.
+        """
+        seen = self._seen_updates
+        if update.update_id in seen:
+            logger.debug("Dropping duplicate update %d", update.update_id)
+            raise ApplicationHandlerStop
+        seen[update.update_id] = None
+        if len(seen) > _SEEN_UPDATES_MAX:
+            seen.popitem(last=False)
+
     # ------------------------------------------------------------------
     # Callback handler (inline keyboards)
     # ------------------------------------------------------------------
@@ -220,92 +408,90 @@ class MetroClaudeBot:
             return
         await query.answer()
 
-        data = query.data
+        # Unified callback system (legacy resume:/permit: have their own handlers)
+        prefix, window_name, index = decode_callback(query.data)
 
-        # Legacy resume handler (backward compat)
-        if data.startswith("resume:"):
-            await self._handle_resume_callback(query)
+        if not window_name:
+            await query.edit_message_text("Donnees invalides.")
             return
 
-        # Legacy permit handler (backward compat)
-        if data.startswith("permit:"):
-            await self._handle_legacy_permit_callback(query)
-            return
+        handler = self._cb_dispatch.get(prefix)
+        if handler:
+            await handler(query, window_name, index)
 
-        # New unified callback system
-        prefix, window_name, index = decode_callback(data)
+    async def _handle_resume_cb(self, query, session_id: str, index: int | None) -> None:
+        """/resume picker — payload is a Claude session ID, not a window."""
+        await self._resume_session(query, session_id)
 
-        if not window_name:
-            await query.edit_message_text("Donnees invalides.")
-            return
+    async def _handle_yesno_cb(self, key: str, query, window_name: str, index: int | None) -> None:
+        """Simple yes/no handlers (permission, planmode, restore); key bound per prefix."""
+        try:
+            await self._tmux_mgr.send_key_and_enter(window_name, key)
+            # Clear tracker and edit message
+            if self._interactive_tracker:
+                self._interactive_tracker.clear(window_name)
+            label = "Approuve" if key == "y" else "Refuse"
+            await query.edit_message_text(label)
+        except Exception as e:
+            logger.warning("Callback send_keys error: %s", e)
+            await query.edit_message_text("Erreur d'envoi.")
 
-        # Simple yes/no handlers (permission, planmode, restore)
-        if prefix in PREFIX_TO_TMUX_KEY:
-            key = PREFIX_TO_TMUX_KEY[prefix]
-            try:
-                await self._tmux_mgr.send_keys_raw(window_name, key)
-                await self._tmux_mgr.send_enter(window_name)
-                # Clear tracker and edit message
-                if self._interactive_tracker:
-                    self._interactive_tracker.clear(window_name)
-                label = "Approuve" if key == "y" else "Refuse"
-                await query.edit_message_text(label)
-            except Exception as e:
-                logger.warning("Callback send_keys error: %s", e)
-                await query.edit_message_text("Erreur d'envoi.")
+    async def _handle_askuser_cb(self, query, window_name: str, index: int | None) -> None:
+        """AskUserQuestion — send option number."""
+        if index is None:
             return
+        try:
+            await self._tmux_mgr.send_key_and_enter(window_name, str(index + 1))
+            if self._interactive_tracker:
+                self._interactive_tracker.clear(window_name)
+            await query.edit_message_text(f"Option {index + 1} selectionnee")
+        except Exception as e:
+            logger.warning("AskUser callback error: %s", e)
+            await query.edit_message_text("Erreur d'envoi.")
 
-        # AskUserQuestion — send option number
-        if prefix == CB_ASKUSER:
-            if index is not None:
-                try:
-                    await self._tmux_mgr.send_keys_raw(window_name, str(index + 1))
-                    await self._tmux_mgr.send_enter(window_name)
-                    if self._interactive_tracker:
-                        self._interactive_tracker.clear(window_name)
-                    await query.edit_message_text(f"Option {index + 1} selectionnee")
-                except Exception as e:
-                    logger.warning("AskUser callback error: %s", e)
-                    await query.edit_message_text("Erreur d'envoi.")
-            return
+    async def _handle_restart_cb(self, query, window_name: str, index: int | None) -> None:
+        """Restart Claude in a window whose process exited."""
+        try:
+            info = self._session_mgr.find_by_window(window_name)
+            if info and info.claude_session_id:
+                cmd = f"{self._claude_command} --resume {info.claude_session_id}"
+            else:
+                cmd = self._claude_command
+            # Send command to the pane (shell should be active since Claude exited)
+            await self._tmux_mgr.send_message(window_name, cmd)
+            if self._interactive_tracker:
+                self._interactive_tracker.clear(window_name)
+            if info:
+                info.is_running = True
+            await query.edit_message_text("Claude relance")
+        except Exception as e:
+            logger.warning("Restart callback error: %s", e)
+            await query.edit_message_text("Erreur lors du redemarrage.")
 
-        # Restart Claude
-        if prefix == CB_RESTART:
-            try:
-                info = self._session_mgr.find_by_window(window_name)
-                if info and info.claude_session_id:
-                    cmd = f"{self._settings.claude_command} --resume {info.claude_session_id}"
-                else:
-                    cmd = self._settings.claude_command
-                # Send command to the pane (shell should be active since Claude exited)
-                await self._tmux_mgr.send_message(window_name, cmd)
-                if self._interactive_tracker:
-                    self._interactive_tracker.clear(window_name)
-                if info:
-                    info.is_running = True
-                await query.edit_message_text("Claude relance")
-            except Exception as e:
-                logger.warning("Restart callback error: %s", e)
-                await query.edit_message_text("Erreur lors du redemarrage.")
-            return
+    async def _handle_refresh_cb(self, query, window_name: str, index: int | None) -> None:
+        """Refresh — re-capture terminal."""
+        try:
+            terminal = await self._tmux_mgr.capture_pane(window_name)
+            truncated = terminal[-_REFRESH_TAIL_CHARS:]
+            await query.edit_message_text(f"```\n{truncated}\n```", parse_mode="Markdown")
+            if self._interactive_tracker:
+                self._interactive_tracker.clear(window_name)
+        except Exception as e:
+            logger.warning("Refresh callback error: %s", e)
+            await query.edit_message_text("Erreur de capture.")
 
-        # Refresh — re-capture terminal
-        if prefix == CB_REFRESH:
-            try:
-                terminal = await self._tmux_mgr.capture_pane(window_name)
-                truncated = terminal[-3900:]
-                await query.edit_message_text(f"```\n{truncated}\n```", parse_mode="Markdown")
-                if self._interactive_tracker:
-                    self._interactive_tracker.clear(window_name)
-            except Exception as e:
-                logger.warning("Refresh callback error: %s", e)
-                await query.edit_message_text("Erreur de capture.")
-            return
+    async def _handle_resume_callback(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+    ) -> None:
+        """Handle legacy resume: callback data (matched by _RESUME_CB_RE)."""
+        query = update.callback_query
+        await query.answer()
+        await self._resume_session(query, context.match.group(1))
 
-    async def _handle_resume_callback(self, query) -> None:
-        """Handle legacy resume: callback data."""
-        data = query.data
-        session_id = data.split(":", 1)[1]
+    async def _resume_session(self, query, session_id: str) -> None:
+        """Resume a recent Claude session in a new window bound to the query's topic."""
         chat_id = query.message.chat.id
         topic_id = query.message.message_thread_id or 0
 
@@ -317,24 +503,35 @@ class MetroClaudeBot:
 
         window_name = f"resume-{session_id[:8]}"
         try:
-            window = await self._tmux_mgr.create_window(
-                window_name,
-                match.working_dir,
-                session_id,
+            # Window creation and monitor setup are independent — run the
+            # tmux spawn and the JSONL file probing concurrently.
+            window, monitor_result = await asyncio.gather(
+                self._tmux_mgr.create_window(
+                    window_name,
+                    match.working_dir,
+                    session_id,
+                ),
+                asyncio.to_thread(
+                    self._monitor.add_session,
+                    session_id,
+                    Path(match.working_dir),
+                ),
+                return_exceptions=True,
             )
+            for result in (window, monitor_result):
+                if isinstance(result, BaseException):
+                    self._monitor.remove_session(session_id)
+                    raise result
+
             # P1-T3: Use actual window name (may have suffix)
             actual_name = window.window_name or window_name
-            info = self._session_mgr.create(
+            self._session_mgr.create(
                 chat_id,
                 topic_id,
                 actual_name,
                 match.working_dir,
             )
-            info.claude_session_id = session_id
-            info.is_running = True
-
-            # Start monitoring
-            self._monitor.add_session(session_id, Path(match.working_dir))
+            self._session_mgr.update_claude_session(chat_id, topic_id, session_id)
 
             await query.edit_message_text(
                 f"Session reprise : `{session_id[:8]}...`\n`{match.working_dir}`",
@@ -344,20 +541,21 @@ class MetroClaudeBot:
             logger.warning("Resume callback error: %s", e)
             await query.edit_message_text("Erreur lors de la reprise.")
 
-    async def _handle_legacy_permit_callback(self, query) -> None:
-        """Handle legacy permit: callback data (backward compat)."""
-        data = query.data
-        parts = data.split(":")
-        action = parts[1]  # "yes" or "no"
-        window_name = parts[2] if len(parts) > 2 else ""
+    async def _handle_legacy_permit_callback(
+        self,
+        update: Update,
+        context: ContextTypes.DEFAULT_TYPE,
+    ) -> None:
+        """Handle legacy permit: callback data (backward compat, matched by _PERMIT_CB_RE)."""
+        query = update.callback_query
+        await query.answer()
+        action, window_name = context.match.group(1, 2)  # action is "yes" or "no"
         if window_name:
             if action == "yes":
-                await self._tmux_mgr.send_keys_raw(window_name, "y")
-                await self._tmux_mgr.send_enter(window_name)
+                await self._tmux_mgr.send_key_and_enter(window_name, "y")
                 await query.edit_message_text("Permission accordee")
             else:
-                await self._tmux_mgr.send_keys_raw(window_name, "n")
-                await self._tmux_mgr.send_enter(window_name)
+                await self._tmux_mgr.send_key_and_enter(window_name, "n")
                 await query.edit_message_text("Permission refusee")
 
     # ------------------------------------------------------------------
@@ -393,9 +591,10 @@ class MetroClaudeBot:
         except Exception as e:
             logger.warning("Error killing window on topic close: %s", e)
 
-        # Stop monitoring
+        # Stop monitoring and drop tool uses that will never get a result
         if info.claude_session_id:
             self._monitor.remove_session(info.claude_session_id)
+            self._forget_tools(info.claude_session_id)
 
         # Remove session
         self._session_mgr.remove(chat_id, topic_id)
@@ -408,29 +607,62 @@ class MetroClaudeBot:
     # Status polling — detect interactive UI and Claude exit
     # ------------------------------------------------------------------
 
+    def _mark_dirty(self, window_name: str) -> None:
+        """Schedule status checks for a window that just produced output."""
+        now = time.monotonic()
+        self._dirty_windows[window_name] = now + _DIRTY_WINDOW_TTL
+        self._last_activity[window_name] = now
+        self._poll_wakeup.set()
+
+    def _backstop_due(self, window_name: str, now: float, started: float) -> bool:
+        """Whether an idle window's backstop check is due (adaptive interval)."""
+        idle_for = now - self._last_activity.get(window_name, started)
+        interval = min(
+            _IDLE_BACKOFF_MAX,
+            _STATUS_POLL_BACKSTOP * 2 ** int(idle_for // _IDLE_BACKOFF_STEP),
+        )
+        return now - self._last_checked.get(window_name, started) >= interval
+
     async def _status_poll_loop(self) -> None:
-        """Background task: poll terminal state for all active sessions.
+        """Background task: poll terminal state for active sessions.
 
-        Every ~2s, capture each session's terminal and check for:
+        Event-driven: JSONL activity marks a window dirty and wakes the loop
+        (see _mark_dirty). Dirty windows are re-checked every ~2s for a short
+        while, since prompts render just after the tool_use is logged. Every
+        ~10s a backstop pass checks running sessions, which catches exits
+        (they produce no JSONL); windows idle for minutes back off to one
+        check every ~30s and snap back on their next JSONL event.
+
+        Each check looks for:
         - Interactive UI (permission, AskUser, PlanMode) -> send keyboard
         - Claude exit -> send restart button
         - P1-S3+SEC10: Stale session cleanup (every ~30s)
         """
-        stale_check_counter = 0
+        started = last_stale_check = last_full_pass = time.monotonic()
         while True:
             try:
-                await asyncio.sleep(2.0)
+                timeout = last_full_pass + _STATUS_POLL_BACKSTOP - time.monotonic()
+                if self._dirty_windows:
+                    timeout = min(timeout, _STATUS_POLL_INTERVAL)
+                try:
+                    await asyncio.wait_for(self._poll_wakeup.wait(), max(timeout, 0.0))
+                except TimeoutError:
+                    pass
+                self._poll_wakeup.clear()
                 if not self._session_mgr or not self._interactive_tracker:
                     continue
 
                 # P1-S3+SEC10+S5: Periodic stale session cleanup (~30s)
-                stale_check_counter += 1
-                if stale_check_counter >= 15:
-                    stale_check_counter = 0
+                now = time.monotonic()
+                if now - last_stale_check >= _STALE_CHECK_INTERVAL:
+                    last_stale_check = now
                     try:
                         windows = await self._tmux_mgr.list_windows()
                         live_names = {w.window_name for w in windows}
                         stale = self._session_mgr.cleanup_stale_sessions(live_names)
+                        for tracked in (self._last_activity, self._last_checked):
+                            for name in tracked.keys() - live_names:
+                                del tracked[name]
                         # P1-S5: Also clean session_map.json
                         if stale:
                             cleanup_stale_map_entries(live_names)
@@ -445,12 +677,32 @@ class MetroClaudeBot:
                     except Exception:
                         logger.debug("Stale cleanup error", exc_info=True)
 
-                sessions = self._session_mgr.all_sessions()
-                for info in sessions:
+                # Dirty windows only, or everything on a backstop pass
+                dirty = self._dirty_windows
+                for name, deadline in list(dirty.items()):
+                    if deadline < now:
+                        del dirty[name]
+                backstop = now - last_full_pass >= _STATUS_POLL_BACKSTOP
+                if backstop:
+                    last_full_pass = now
+
+                to_poll = []
+                for info in self._session_mgr.all_sessions():
                     if not info.is_running:
                         continue
+                    name = info.window_name
+                    if name in dirty:
+                        to_poll.append(info)
+                    elif backstop and self._backstop_due(name, now, started):
+                        self._last_checked[name] = now
+                        to_poll.append(info)
+                if not to_poll:
+                    continue
+                # One tmux call for all pane commands (exit detection)
+                pane_commands = await self._tmux_mgr.get_pane_commands()
+                for info in to_poll:
                     try:
-                        await self._poll_session(info)
+                        await self._poll_session(info, pane_commands.get(info.window_name))
                     except Exception:
                         logger.debug("Poll error for %s", info.window_name, exc_info=True)
             except asyncio.CancelledError:
@@ -459,11 +711,14 @@ class MetroClaudeBot:
                 logger.exception("Status poll loop error")
                 await asyncio.sleep(5)  # Back off on error
 
-    async def _poll_session(self, info) -> None:
-        """Poll a single session for interactive UI or exit."""
+    async def _poll_session(self, info, pane_command: str | None) -> None:
+        """Poll a single session for interactive UI or exit.
+
+        *pane_command* is the window's foreground command, pre-fetched for
+        all windows at once by the status loop.
+        """
         # Check for Claude exit first
-        cmd = await self._tmux_mgr.get_pane_current_command(info.window_name)
-        if detect_claude_exit(cmd):
+        if detect_claude_exit(pane_command):
             if self._interactive_tracker.should_send(info.window_name, "exit", "exit"):
                 keyboard = build_restart_keyboard(info.window_name)
                 text = format_exit_text(info.window_name)
@@ -534,13 +789,35 @@ class MetroClaudeBot:
     def _on_claude_events(self, session_id: str, events: list[ParsedEvent]) -> None:
         """Called by MonitorPool when new events are detected (sync callback).
 
-        We schedule the async dispatch on the running event loop.
+        We schedule the async dispatch on the bot's event loop (cached in
+        run()). call_soon_threadsafe keeps this safe if the callback ever
+        fires from a worker thread.
         """
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self._dispatch_events(session_id, events))
-        except RuntimeError:
+        loop = self._loop
+        if loop is None or loop.is_closed():
             logger.debug("No running loop, skipping event dispatch")
+            return
+        loop.call_soon_threadsafe(self._schedule_dispatch, session_id, events)
+
+    def _schedule_dispatch(self, session_id: str, events: list[ParsedEvent]) -> None:
+        """Create the dispatch task (runs on the event loop thread)."""
+        task = self._loop.create_task(self._dispatch_events(session_id, events))
+        # The loop only keeps weak references to tasks; hold one until done
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    def _remember_tool(self, session_id: str, tool_id: str, formatted: str) -> None:
+        """Track a tool_use until its result arrives, bounded to _PENDING_TOOLS_MAX."""
+        self._pending_tools[tool_id] = (session_id, formatted)
+        self._pending_tools.move_to_end(tool_id)
+        while len(self._pending_tools) > _PENDING_TOOLS_MAX:
+            self._pending_tools.popitem(last=False)
+
+    def _forget_tools(self, session_id: str) -> None:
+        """Drop pending tool_use entries belonging to a removed session."""
+        stale = [tid for tid, (sid, _) in self._pending_tools.items() if sid == session_id]
+        for tid in stale:
+            del self._pending_tools[tid]
 
     async def _dispatch_events(self, session_id: str, events: list[ParsedEvent]) -> None:
         """Process parsed events and send relevant ones to Telegram."""
@@ -550,23 +827,57 @@ class MetroClaudeBot:
             logger.debug("No session info for %s, skipping dispatch", session_id)
             return
 
+        # New output — have the status loop look at this window soon
+        self._mark_dirty(info.window_name)
+
         chat_id = info.chat_id
         topic_id = info.topic_id if info.topic_id else None
-        logger.info(
-            "Dispatching %d event(s) for session %s → chat %d topic %s",
-            len(events),
-            session_id[:8],
-            chat_id,
-            topic_id,
-        )
+
+        # Per-batch and per-event trace lines are DEBUG; check the level once
+        # so slicing/arguments are skipped entirely at INFO.
+        trace = logger.isEnabledFor(logging.DEBUG)
+        if trace:
+            logger.debug(
+                "Dispatching %d event(s) for session %s → chat %d topic %s",
+                len(events),
+                session_id[:8],
+                chat_id,
+                topic_id,
+            )
+
+        # Consecutive text events are coalesced into a single CONTENT task
+        # (bounded by message_merge_max_length) so a burst of assistant text
+        # costs one sendMessage instead of one per event. All resulting tasks
+        # are handed to the queue in one enqueue_many() after the loop.
+        max_merge = self._settings.message_merge_max_length
+        outgoing: list[MessageTask] = []
+        text_parts: list[str] = []
+        text_len = 0
+
+        def flush_text() -> None:
+            nonlocal text_len
+            if text_parts:
+                outgoing.append(
+                    MessageTask(
+                        chat_id=chat_id,
+                        thread_id=topic_id,
+                        text=_TEXT_JOIN.join(text_parts),
+                        task_type=TaskType.CONTENT,
+                    )
+                )
+            text_parts.clear()
+            text_len = 0
+
+        # P1-SEC8: Typing follows JSONL events (tools → typing, text → stop).
+        # Only the last relevant event of the batch matters, so the state is
+        # applied once after the loop instead of toggled per event.
+        typing: bool | None = None
 
         for event in events:
-            # P1-SEC8: Typing management connected to JSONL events
-            if self._typing:
-                if event.event_type in (EventType.TOOL_USE, EventType.TOOL_RESULT):
-                    self._typing.start_typing(chat_id, topic_id)
-                elif event.event_type == EventType.TEXT:
-                    self._typing.stop_typing(chat_id, topic_id)
+            if event.event_type in (EventType.TOOL_USE, EventType.TOOL_RESULT):
+                typing = True
+            elif event.event_type == EventType.TEXT:
+                typing = False
 
             # P1-M1: Tool pairing — track tool_use display text,
             # then edit the message with ✅/❌ when tool_result arrives
@@ -574,28 +885,32 @@ class MetroClaudeBot:
                 formatted = format_event_for_telegram(event)
                 if not formatted:
                     continue
-                logger.info("→ TOOL_USE: %s", formatted[:80])
+                if trace:
+                    logger.debug("→ TOOL_USE: %s", formatted[:80])
                 # Store for pairing with the future tool_result
                 if event.tool_id:
-                    self._pending_tools[event.tool_id] = formatted
-                if self._queue:
-                    await self._queue.enqueue(
-                        MessageTask(
-                            chat_id=chat_id,
-                            thread_id=topic_id,
-                            text=formatted,
-                            task_type=TaskType.TOOL_USE,
-                            tool_id=event.tool_id,
-                        )
+                    self._remember_tool(session_id, event.tool_id, formatted)
+                flush_text()  # Keep text and tool messages in order
+                outgoing.append(
+                    MessageTask(
+                        chat_id=chat_id,
+                        thread_id=topic_id,
+                        text=formatted,
+                        task_type=TaskType.TOOL_USE,
+                        tool_id=event.tool_id,
                     )
+                )
 
             elif event.event_type == EventType.TOOL_RESULT:
-                original_text = self._pending_tools.pop(event.tool_id, None)
-                if original_text and self._queue:
-                    tid = event.tool_id[:8] if event.tool_id else "?"
-                    logger.info("→ TOOL_RESULT: %s (error=%s)", tid, event.is_error)
+                pending = self._pending_tools.pop(event.tool_id, None)
+                original_text = pending[1] if pending else None
+                if original_text:
+                    if trace:
+                        tid = event.tool_id[:8] if event.tool_id else "?"
+                        logger.debug("→ TOOL_RESULT: %s (error=%s)", tid, event.is_error)
                     suffix = " ❌" if event.is_error else " ✅"
-                    await self._queue.enqueue(
+                    flush_text()
+                    outgoing.append(
                         MessageTask(
                             chat_id=chat_id,
                             thread_id=topic_id,
@@ -609,21 +924,39 @@ class MetroClaudeBot:
                 formatted = format_event_for_telegram(event)
                 if not formatted:
                     continue
-                logger.info("→ TEXT: %s", formatted[:80])
-                if self._queue:
-                    await self._queue.enqueue(
-                        MessageTask(
-                            chat_id=chat_id,
-                            thread_id=topic_id,
-                            text=formatted,
-                            task_type=TaskType.CONTENT,
-                        )
-                    )
+                if trace:
+                    logger.debug("→ TEXT: %s", formatted[:80])
+                sep = len(_TEXT_JOIN) if text_parts else 0
+                if sep and text_len + sep + len(formatted) > max_merge:
+                    flush_text()
+                    sep = 0
+                text_parts.append(formatted)
+                text_len += sep + len(formatted)
+
+        flush_text()
+        if outgoing and self._queue:
+            await self._queue.enqueue_many(outgoing)
+
+        if self._typing and typing is not None:
+            if typing:
+                self._typing.start_typing(chat_id, topic_id)
+            else:
+                self._typing.stop_typing(chat_id, topic_id)
 
     # ------------------------------------------------------------------
     # Telegram sending
     # ------------------------------------------------------------------
 
+    async def _to_telegram(self, text: str) -> tuple[str, str]:
+        """Run the markdown conversion on the formatting thread.
+
+        Rendering long Claude responses is CPU work that would otherwise
+        stall the event loop. A single worker is used on purpose: the
+        mistletoe renderer swaps module-global token tables while it runs,
+        so conversions must not overlap.
+        """
+        return await self._loop.run_in_executor(self._fmt_pool, to_telegram, text)
+
     async def _send_telegram_message(
         self,
         chat_id: int,
@@ -632,35 +965,41 @@ class MetroClaudeBot:
     ) -> int | None:
         """Send a message to Telegram with markdown formatting and fallback.
 
-        Returns the message_id on success, None on failure.
+        Returns the message_id. Only a rejected MarkdownV2 payload is retried
+        as plain text here; other errors are raised so the queue's
+        _send_with_retry can back off.
         """
-        if not self._app:
+        bot = self._bot
+        if not bot:
             return None
 
-        formatted, parse_mode = to_telegram(text)
-
-        kwargs = {
-            "chat_id": chat_id,
-            "text": formatted or text,
-        }
-        if parse_mode:
-            kwargs["parse_mode"] = parse_mode
-        if thread_id:
-            kwargs["message_thread_id"] = thread_id
+        formatted, parse_mode = await self._to_telegram(text)
+        if not parse_mode:
+            # Conversion already fell back to plain text: nothing to retry
+            result = await bot.send_message(
+                chat_id=chat_id,
+                text=formatted or text,
+                message_thread_id=thread_id or None,
+            )
+            return result.message_id
 
         try:
-            result = await self._app.bot.send_message(**kwargs)
-            return result.message_id
-        except Exception:
-            # Fallback: send without formatting (P1-MD3)
-            kwargs.pop("parse_mode", None)
-            kwargs["text"] = text
-            try:
-                result = await self._app.bot.send_message(**kwargs)
-                return result.message_id
-            except Exception as e:
-                logger.error("Failed to send message: %s", e)
-                return None
+            result = await bot.send_message(
+                chat_id=chat_id,
+                text=formatted,
+                parse_mode=parse_mode,
+                message_thread_id=thread_id or None,
+            )
+        except BadRequest as e:
+            # Telegram rejected the entities: resend unformatted (P1-MD3).
+            # Other errors (RetryAfter, network) propagate to the queue's retry.
+            logger.debug("Markdown rejected, sending plain text: %s", e)
+            result = await bot.send_message(
+                chat_id=chat_id,
+                text=text,
+                message_thread_id=thread_id or None,
+            )
+        return result.message_id
 
     async def _edit_telegram_message(
         self,
@@ -670,29 +1009,36 @@ class MetroClaudeBot:
         thread_id: int | None,
     ) -> None:
         """Edit an existing Telegram message with markdown formatting and fallback."""
-        if not self._app:
+        bot = self._bot
+        if not bot:
             return
 
-        formatted, parse_mode = to_telegram(text)
-
-        kwargs = {
-            "chat_id": chat_id,
-            "message_id": message_id,
-            "text": formatted or text,
-        }
-        if parse_mode:
-            kwargs["parse_mode"] = parse_mode
+        formatted, parse_mode = await self._to_telegram(text)
 
         try:
-            await self._app.bot.edit_message_text(**kwargs)
-        except Exception:
+            await bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=formatted or text,
+                parse_mode=parse_mode or None,
+            )
+        except BadRequest as e:
+            if not parse_mode:
+                logger.error("Failed to edit message: %s", e)
+                return
             # Fallback: edit without formatting (P1-MD3)
-            kwargs.pop("parse_mode", None)
-            kwargs["text"] = text
             try:
-                await self._app.bot.edit_message_text(**kwargs)
+                await bot.edit_message_text(
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    text=text,
+                    parse_mode=None,
+                )
             except Exception as e:
                 logger.error("Failed to edit message: %s", e)
+        except Exception as e:
+            # Not a formatting problem: a plain-text retry would fail the same way
+            logger.error("Failed to edit message: %s", e)
 
     async def _delete_telegram_message(
         self,
@@ -701,10 +1047,10 @@ class MetroClaudeBot:
         thread_id: int | None,
     ) -> None:
         """Delete a Telegram message."""
-        if not self._app:
+        if not self._bot:
             return
 
         try:
-            await self._app.bot.delete_message(chat_id=chat_id, message_id=message_id)
+            await self._bot.delete_message(chat_id=chat_id, message_id=message_id)
         except Exception as e:
             logger.debug("Failed to delete message: %s", e)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import os
 from pathlib import Path
 
@@ -10,7 +11,8 @@ from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
-    model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
+    # frozen: settings are loaded once and shared (see get_settings)
+    model_config = {"env_file": ".env", "env_file_encoding": "utf-8", "frozen": True}
 
     # Required
     telegram_bot_token: str
@@ -20,6 +22,12 @@ class Settings(BaseSettings):
     tmux_session_name: str = "metroclaude"
     claude_command: str = "claude"
 
+    # Telegram webhook (optional — long polling is used when webhook_url is empty)
+    webhook_url: str = ""  # Public base URL, e.g. "https://bot.example.com/"
+    webhook_listen: str = "127.0.0.1"
+    webhook_port: int = 8443
+    webhook_secret: str = ""  # Checked against X-Telegram-Bot-Api-Secret-Token
+
     # Monitor
     monitor_poll_interval: float = 2.0
 
@@ -31,39 +39,54 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
 
+    # Process tuning (Linux only) — pin the bot to one CPU core to reduce
+    # scheduler migrations of the event loop thread. None = no pinning.
+    cpu_affinity_core: int | None = None
+
     # Message limits
     telegram_max_message_length: int = 4096
     message_merge_delay: float = 0.5  # seconds to wait before merging
     message_merge_max_length: int = 3800  # leave room for formatting
 
-    # Blocked Claude commands (interactive, would crash in Telegram)
-    blocked_commands: list[str] = [
-        "/mcp",
-        "/help",
-        "/settings",
-        "/config",
-        "/model",
-        "/compact",
-        "/cost",
-        "/doctor",
-        "/init",
-        "/login",
-        "/logout",
-        "/memory",
-        "/permissions",
-        "/pr",
-        "/review",
-        "/terminal",
-        "/vim",
-        "/approved-tools",
-        "/listen",
-    ]
-
-    def get_allowed_user_ids(self) -> list[int]:
-        """Parse allowed_users CSV string into list of ints."""
+    # Blocked Claude commands (interactive, would crash in Telegram).
+    # A frozenset so the per-message membership check is a hash lookup.
+    blocked_commands: frozenset[str] = frozenset(
+        {
+            "/mcp",
+            "/help",
+            "/settings",
+            "/config",
+            "/model",
+            "/compact",
+            "/cost",
+            "/doctor",
+            "/init",
+            "/login",
+            "/logout",
+            "/memory",
+            "/permissions",
+            "/pr",
+            "/review",
+            "/terminal",
+            "/vim",
+            "/approved-tools",
+            "/listen",
+        }
+    )
+
+    def get_allowed_user_ids(self) -> frozenset[int]:
+        """Parse allowed_users CSV string into a set of ints.
+
+        Parsed once per Settings instance (settings are frozen): this runs
+        on every authorization check.
+        """
+        return self._allowed_user_ids
+
+    @functools.cached_property
+    def _allowed_user_ids(self) -> frozenset[int]:
         if not self.allowed_users or not self.allowed_users.strip():
-            return []
-        return [int(uid.strip()) for uid in self.allowed_users.split(",") if uid.strip()]
+            return frozenset()
+        return frozenset(int(uid.strip()) for uid in self.allowed_users.split(",") if uid.strip())
 
     @field_validator("working_dir", "state_dir", "claude_projects_dir", mode="before")
     @classmethod
@@ -75,9 +98,9 @@ class Settings(BaseSettings):
         self.state_dir.mkdir(parents=True, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Load settings (cached singleton)."""
-    if not hasattr(get_settings, "_instance"):
-        get_settings._instance = Settings()  # type: ignore[attr-defined]
-        get_settings._instance.ensure_dirs()
-    return get_settings._instance  # type: ignore[attr-defined]
+    settings = Settings()
+    settings.ensure_dirs()
+    return settings
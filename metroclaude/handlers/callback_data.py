@@ -4,6 +4,8 @@ Format: "PREFIX:payload" where payload is window_name or "index:window_name".
 Total length must be < 64 bytes (Telegram limit).
 """
 
+import functools
+
 # Callback prefixes — each type of interactive UI has its own prefix
 CB_PERMIT_YES = "py"  # Permission: approve
 CB_PERMIT_NO = "pn"  # Permission: deny
@@ -14,6 +16,7 @@ CB_RESTART = "rs"  # Restart Claude after exit
 CB_REFRESH = "rf"  # Refresh terminal capture
 CB_RESTORE_YES = "ry"  # RestoreCheckpoint: yes
 CB_RESTORE_NO = "rn"  # RestoreCheckpoint: no
+CB_RESUME = "ru"  # /resume: payload is the Claude session ID instead of a window
 
 # Map prefixes to the tmux key to send
 PREFIX_TO_TMUX_KEY = {
@@ -26,31 +29,46 @@ PREFIX_TO_TMUX_KEY = {
 }
 
 
+# Telegram rejects callback_data longer than this many UTF-8 bytes
+_MAX_CALLBACK_BYTES = 64
+
+
+@functools.lru_cache(maxsize=512)
 def encode_callback(prefix: str, window_name: str, index: int | None = None) -> str:
-    """Encode callback data. Truncates window_name to fit 64 byte limit."""
+    """Encode callback data. Truncates window_name to fit 64 byte limit.
+
+    Memoized: inputs come from a few prefixes and a bounded set of windows.
+    """
     if index is not None:
-        payload = f"{index}:{window_name}"
+        data = f"{prefix}:{index}:{window_name}"
     else:
-        payload = window_name
-    data = f"{prefix}:{payload}"
-    return data[:64]  # Telegram limit
+        data = f"{prefix}:{window_name}"
+    if len(data) <= _MAX_CALLBACK_BYTES and data.isascii():
+        return data
+    # Telegram's limit is in UTF-8 bytes: cut there, dropping a split character
+    raw = data.encode("utf-8")[:_MAX_CALLBACK_BYTES]
+    return raw.decode("utf-8", errors="ignore")
 
 
 def decode_callback(data: str) -> tuple[str, str, int | None]:
-    """Decode callback data -> (prefix, window_name, index_or_none)."""
-    parts = data.split(":", 2)
-    prefix = parts[0]
-    if len(parts) == 3:
-        # Has index: "au:2:window-name"
+    """Decode callback data -> (prefix, window_name, index_or_none).
+
+    Positional scan for the two separators (same result as split(":", 2)).
+    """
+    sep = data.find(":")
+    if sep < 0:
+        return data, "", None
+    prefix = data[:sep]
+    sep2 = data.find(":", sep + 1)
+    if sep2 < 0:
+        return prefix, data[sep + 1 :], None
+    # Has index: "au:2:window-name"
+    raw_index = data[sep + 1 : sep2]
+    if raw_index.isascii() and raw_index.isdigit():
+        index: int | None = int(raw_index)
+    else:
         try:
-            index = int(parts[1])
+            index = int(raw_index)
         except ValueError:
             index = None
-        window_name = parts[2]
-    elif len(parts) == 2:
-        index = None
-        window_name = parts[1]
-    else:
-        index = None
-        window_name = ""
-    return prefix, window_name, index
+    return prefix, data[sep2 + 1 :], index
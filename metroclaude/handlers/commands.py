@@ -3,35 +3,43 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import os
+import sys
+import time
 from pathlib import Path
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 from ..config import get_settings
-from ..hooks import read_session_map
+from ..hooks import read_session_map, session_map_signature
 from ..security.auth import check_auth
 from ..security.input_sanitizer import sanitize_path_argument
+from .callback_data import CB_RESUME, encode_callback
 
 logger = logging.getLogger(__name__)
 
+_START_TEXT = (
+    "*MetroClaude* — Claude Code depuis Telegram\n\n"
+    "Commandes :\n"
+    "/new — Nouvelle session Claude\n"
+    "/stop — Arreter la session du topic\n"
+    "/status — Etat des sessions\n"
+    "/resume — Reprendre une session recente\n"
+    "/screenshot — Capture du terminal\n"
+)
+
+# How often /new checks session_map.json for the SessionStart hook's entry
+_SESSION_MAP_POLL = 0.2
+
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start — welcome message."""
     if not await check_auth(update, audit=context.bot_data.get("audit")):
         return
-    await update.message.reply_text(
-        "*MetroClaude* — Claude Code depuis Telegram\n\n"
-        "Commandes :\n"
-        "/new — Nouvelle session Claude\n"
-        "/stop — Arreter la session du topic\n"
-        "/status — Etat des sessions\n"
-        "/resume — Reprendre une session recente\n"
-        "/screenshot — Capture du terminal\n",
-        parse_mode="Markdown",
-    )
+    await update.message.reply_text(_START_TEXT, parse_mode="Markdown")
 
 
 async def cmd_new(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -108,13 +116,6 @@ async def cmd_new(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         info = session_mgr.create(chat_id, topic_id, actual_name, work_dir)
         info.is_running = True
 
-        await update.message.reply_text(
-            f"Session creee !\n"
-            f"`{work_dir}`\n"
-            f"`tmux attach -t {settings.tmux_session_name}` pour voir",
-            parse_mode="Markdown",
-        )
-
         # P2-SEC6: Audit session creation
         if audit:
             await audit.log_session_event(
@@ -125,12 +126,19 @@ async def cmd_new(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             )
 
         # Wait for SessionStart hook to write session_map.json (pattern from ccbot)
-        # This is non-critical — if it fails, the session still works
+        # This is non-critical — if it fails, the session still works.
+        # The confirmation is sent meanwhile so its latency hides behind the wait.
         tmux_session = settings.tmux_session_name
         map_key = f"{tmux_session}:{actual_name}"
-        session_id = await _wait_for_session_map(map_key, max_wait=10.0)
+        _, session_id = await asyncio.gather(
+            update.message.reply_text(
+                f"Session creee !\n`{work_dir}`\n`tmux attach -t {tmux_session}` pour voir",
+                parse_mode="Markdown",
+            ),
+            _wait_for_session_map(map_key, max_wait=10.0),
+        )
         if session_id and monitor_pool:
-            info.claude_session_id = session_id
+            session_mgr.update_claude_session(chat_id, topic_id, session_id)
             try:
                 monitor_pool.add_session(session_id)
                 logger.info("Monitoring JSONL for session %s", session_id)
@@ -226,7 +234,8 @@ async def cmd_resume(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     keyboard = []
     for r in recent:
         label = f"{Path(r.working_dir).name} ({r.session_id[:8]})"
-        keyboard.append([InlineKeyboardButton(label, callback_data=f"resume:{r.session_id}")])
+        cb = encode_callback(CB_RESUME, r.session_id)
+        keyboard.append([InlineKeyboardButton(label, callback_data=cb)])
 
     await update.message.reply_text(
         "Reprendre une session :",
@@ -269,43 +278,74 @@ async def cmd_screenshot(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 # ------------------------------------------------------------------
 
 
+# Resolved once: Path.home() consults the environment/passwd on every call
+_HOME_STR = str(Path.home())
+_HOME_PREFIX = _HOME_STR.rstrip(os.sep) + os.sep
+
+
 def _is_path_allowed(resolved_path: Path) -> bool:
     """Validate that a resolved path is under the user's home directory.
 
-    Uses resolve() + relative_to() pattern from RichardAtCT.
+    Expects a resolve()d path (pattern from RichardAtCT), then compares
+    strings against the home prefix — the separator check keeps /home/user2
+    out when home is /home/user.
     Prevents path traversal attacks (e.g., /etc/passwd, /root).
     """
-    home = Path.home()
-    try:
-        resolved_path.relative_to(home)
-        return True
-    except ValueError:
-        return False
+    path_str = str(resolved_path)
+    return path_str == _HOME_STR or path_str.startswith(_HOME_PREFIX)
 
 
 async def _wait_for_session_map(map_key: str, max_wait: float = 10.0) -> str | None:
     """Wait for the SessionStart hook to write session_map.json.
 
-    Pattern from ccbot: poll session_map.json until our window key appears.
-    The hook is triggered by Claude Code itself when it starts.
+    Pattern from ccbot: wait until our window key appears in session_map.json.
+    The hook is triggered by Claude Code itself (another process) when it
+    starts, so we watch the file: a stat every _SESSION_MAP_POLL seconds,
+    and the JSON is only re-read when the file has changed.
     """
-    import time
-
-    deadline = time.time() + max_wait
-    while time.time() < deadline:
-        await asyncio.sleep(1.5)
-        session_map = read_session_map()
-        if map_key in session_map:
-            session_id = session_map[map_key].get("session_id", "")
+    deadline = time.monotonic() + max_wait
+    last_seen: tuple[int, int, int] | None = None
+    while True:
+        signature = session_map_signature()
+        if signature is not None and signature != last_seen:
+            last_seen = signature
+            entry = read_session_map().get(map_key)
+            session_id = entry.get("session_id", "") if entry else ""
             if session_id:
                 logger.info("Hook detected session %s for %s", session_id, map_key)
                 return session_id
-    return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(_SESSION_MAP_POLL, remaining))
+
+
+_ALLOWED_PUNCT = frozenset("-_")
+
+
+class _WindowNameTable(dict):
+    """str.translate table: keep alphanumerics, '-' and '_', map the rest to '-'.
+
+    Filled lazily per code point so Unicode letters behave as with isalnum().
+    """
+
+    def __missing__(self, code: int) -> int | str:
+        c = chr(code)
+        value: int | str = code if c.isalnum() or c in _ALLOWED_PUNCT else "-"
+        self[code] = value
+        return value
+
 
+_WINDOW_NAME_TABLE = _WindowNameTable()
 
+
+@functools.lru_cache(maxsize=128)
 def _sanitize_window_name(name: str) -> str:
-    """Sanitize a string for use as tmux window name."""
+    """Sanitize a string for use as tmux window name.
+
+    The result is interned: window names key the keyboard caches and
+    callback data for the lifetime of a topic.
+    """
     # tmux window names: remove dots and special chars
-    clean = "".join(c if c.isalnum() or c in "-_" else "-" for c in name.lower())
-    clean = clean.strip("-")[:30]
-    return clean or "session"
+    clean = name.lower().translate(_WINDOW_NAME_TABLE).strip("-")[:30]
+    return sys.intern(clean or "session")
@@ -10,9 +10,11 @@ Builds Telegram inline keyboards for Claude Code interactive prompts:
 
 from __future__ import annotations
 
-import hashlib
+import functools
+import itertools
 import logging
 import re
+from collections.abc import Callable
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -32,16 +34,32 @@ from .status import InteractiveUIInfo
 
 logger = logging.getLogger(__name__)
 
-# Patterns for extracting AskUserQuestion options from terminal content
-_CHECKBOX_RE = re.compile(r"^\s*[←]?\s*([☐✔☒])\s+(.+)")
-_NUMBERED_RE = re.compile(r"^\s*(\d+)[.)]\s+(.+)")
+# AskUserQuestion option lines, scanned over the whole capture at once:
+# "[arrow] checkbox label" or "N. label" / "N) label". [^\S\n] is
+# whitespace that cannot run past the end of the line.
+_OPTION_RE = re.compile(
+    r"^[^\S\n]*(?:←?[^\S\n]*[☐✔☒]|\d+[.)])[^\S\n]+(.+)",
+    re.MULTILINE,
+)
+
+# A non-blank line from its first non-space character (trailing space kept)
+_NONBLANK_LINE_RE = re.compile(r"\S[^\n]*")
 
 
 # ------------------------------------------------------------------
 # Keyboard builders
 # ------------------------------------------------------------------
 
+# Fixed-button keyboards depend only on the window name and
+# InlineKeyboardMarkup is immutable, so each one is built once per window.
+_KEYBOARD_CACHE_SIZE = 512
+
+# Option buttons per AskUserQuestion keyboard (Claude offers a handful; the
+# cap bounds the scan on captures full of numbered lines)
+_MAX_ASKUSER_OPTIONS = 10
 
+
+@functools.lru_cache(maxsize=_KEYBOARD_CACHE_SIZE)
 def build_permission_keyboard(window_name: str) -> InlineKeyboardMarkup:
     """Build a 2-button keyboard for permission prompts (Allow / Deny)."""
     return InlineKeyboardMarkup(
@@ -60,17 +78,9 @@ def build_permission_keyboard(window_name: str) -> InlineKeyboardMarkup:
 
 def build_askuser_keyboard(content: str, window_name: str) -> InlineKeyboardMarkup:
     """Build a keyboard with options extracted from AskUserQuestion content."""
-    options = parse_askuser_options(content)
+    options = parse_askuser_options(content, _MAX_ASKUSER_OPTIONS)
     if not options:
-        # Fallback: single "Reply" button (user types answer)
-        cb = encode_callback(CB_ASKUSER, window_name, 0)
-        return InlineKeyboardMarkup(
-            [
-                [
-                    InlineKeyboardButton("Reply...", callback_data=cb),
-                ]
-            ]
-        )
+        return _build_askuser_reply_keyboard(window_name)
     buttons = []
     for idx, label in options:
         # Truncate label for button display (max 40 chars)
@@ -86,6 +96,20 @@ def build_askuser_keyboard(content: str, window_name: str) -> InlineKeyboardMark
     return InlineKeyboardMarkup(buttons)
 
 
+@functools.lru_cache(maxsize=_KEYBOARD_CACHE_SIZE)
+def _build_askuser_reply_keyboard(window_name: str) -> InlineKeyboardMarkup:
+    """Fallback for unparsed options: single "Reply" button (user types answer)."""
+    cb = encode_callback(CB_ASKUSER, window_name, 0)
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton("Reply...", callback_data=cb),
+            ]
+        ]
+    )
+
+
+@functools.lru_cache(maxsize=_KEYBOARD_CACHE_SIZE)
 def build_planmode_keyboard(window_name: str) -> InlineKeyboardMarkup:
     """Build a 2-button keyboard for ExitPlanMode (Proceed / Cancel)."""
     cb_yes = encode_callback(CB_PLANMODE_YES, window_name)
@@ -100,6 +124,7 @@ def build_planmode_keyboard(window_name: str) -> InlineKeyboardMarkup:
     )
 
 
+@functools.lru_cache(maxsize=_KEYBOARD_CACHE_SIZE)
 def build_restore_keyboard(window_name: str) -> InlineKeyboardMarkup:
     """Build a 2-button keyboard for RestoreCheckpoint (Yes / No)."""
     return InlineKeyboardMarkup(
@@ -116,6 +141,7 @@ def build_restore_keyboard(window_name: str) -> InlineKeyboardMarkup:
     )
 
 
+@functools.lru_cache(maxsize=_KEYBOARD_CACHE_SIZE)
 def build_restart_keyboard(window_name: str) -> InlineKeyboardMarkup:
     """Build a 2-button keyboard for post-exit (Restart / Refresh)."""
     return InlineKeyboardMarkup(
@@ -132,20 +158,23 @@ def build_restart_keyboard(window_name: str) -> InlineKeyboardMarkup:
     )
 
 
+# UI name -> builder(ui_info, window_name); built once at import
+_UI_KEYBOARD_BUILDERS: dict[str, Callable[[InteractiveUIInfo, str], InlineKeyboardMarkup]] = {
+    "PermissionPrompt": lambda ui, w: build_permission_keyboard(w),
+    "AskUserQuestion": lambda ui, w: build_askuser_keyboard(ui.content, w),
+    "ExitPlanMode": lambda ui, w: build_planmode_keyboard(w),
+    "RestoreCheckpoint": lambda ui, w: build_restore_keyboard(w),
+}
+
+
 def build_keyboard_for_ui(
     ui_info: InteractiveUIInfo,
     window_name: str,
 ) -> InlineKeyboardMarkup | None:
     """Dispatch to the right keyboard builder based on UI type."""
-    builders = {
-        "PermissionPrompt": lambda: build_permission_keyboard(window_name),
-        "AskUserQuestion": lambda: build_askuser_keyboard(ui_info.content, window_name),
-        "ExitPlanMode": lambda: build_planmode_keyboard(window_name),
-        "RestoreCheckpoint": lambda: build_restore_keyboard(window_name),
-    }
-    builder = builders.get(ui_info.name)
+    builder = _UI_KEYBOARD_BUILDERS.get(ui_info.name)
     if builder:
-        return builder()
+        return builder(ui_info, window_name)
     return None
 
 
@@ -154,28 +183,21 @@ def build_keyboard_for_ui(
 # ------------------------------------------------------------------
 
 
-def parse_askuser_options(content: str) -> list[tuple[int, str]]:
+def parse_askuser_options(
+    content: str,
+    max_options: int | None = None,
+) -> list[tuple[int, str]]:
     """Extract options from AskUserQuestion terminal content.
 
     Looks for lines matching:
       - Checkbox patterns: [arrow] checkbox_char label
       - Numbered patterns: N. label or N) label
 
+    Scanning stops after *max_options* matches (None = no limit).
     Returns list of (index, label) tuples.
     """
-    options: list[tuple[int, str]] = []
-    idx = 0
-    for line in content.split("\n"):
-        m = _CHECKBOX_RE.match(line)
-        if m:
-            options.append((idx, m.group(2).strip()))
-            idx += 1
-            continue
-        m = _NUMBERED_RE.match(line)
-        if m:
-            options.append((idx, m.group(2).strip()))
-            idx += 1
-    return options
+    matches = itertools.islice(_OPTION_RE.finditer(content), max_options)
+    return [(idx, m.group(1).strip()) for idx, m in enumerate(matches)]
 
 
 # ------------------------------------------------------------------
@@ -188,12 +210,13 @@ class InteractiveTracker:
 
     Each window can have at most one active interactive keyboard.
     Dedup is based on (ui_name, content_hash) — if the same UI with
-    the same content is detected again, we skip sending.
+    the same content is detected again, we skip sending. The hash is only
+    compared in-process, so the builtin str hash is enough.
     """
 
     def __init__(self) -> None:
         # window_name -> (ui_name, msg_id, content_hash)
-        self._active: dict[str, tuple[str, int, str]] = {}
+        self._active: dict[str, tuple[str, int, int]] = {}
 
     def should_send(self, window_name: str, ui_name: str, content: str) -> bool:
         """Return True if this UI hasn't been sent yet (or content changed)."""
@@ -223,9 +246,9 @@ class InteractiveTracker:
         return None
 
 
-def _content_hash(content: str) -> str:
-    """Short hash of content for dedup comparison."""
-    return hashlib.md5(content.encode()).hexdigest()[:12]
+def _content_hash(content: str) -> int:
+    """Hash of content for dedup comparison (never persisted)."""
+    return hash(content)
 
 
 # ------------------------------------------------------------------
@@ -233,25 +256,32 @@ def _content_hash(content: str) -> str:
 # ------------------------------------------------------------------
 
 
+def _preview(content: str, max_lines: int) -> str:
+    """First *max_lines* non-blank lines (stripped), "..." if more follow.
+
+    The regex finds each line's first non-space character in C and the scan
+    stops one line past the limit instead of stripping every line of the screen.
+    """
+    matches = itertools.islice(_NONBLANK_LINE_RE.finditer(content), max_lines + 1)
+    lines = [m.group().rstrip() for m in matches]
+    preview = "\n".join(lines[:max_lines])
+    if len(lines) > max_lines:
+        preview += "\n..."
+    return preview
+
+
 def format_permission_text(content: str) -> str:
     """Format a permission prompt notification for Telegram."""
     # Extract the key info — first few meaningful lines
-    lines = [line.strip() for line in content.split("\n") if line.strip()]
-    preview = "\n".join(lines[:5])
-    if len(lines) > 5:
-        preview += "\n..."
-    return f"**Permission required**\n\n```\n{preview}\n```"
+    return f"**Permission required**\n\n```\n{_preview(content, 5)}\n```"
 
 
 def format_askuser_text(content: str) -> str:
     """Format an AskUserQuestion notification for Telegram."""
-    lines = [line.strip() for line in content.split("\n") if line.strip()]
-    preview = "\n".join(lines[:8])
-    if len(lines) > 8:
-        preview += "\n..."
-    return f"**Question from Claude**\n\n```\n{preview}\n```"
+    return f"**Question from Claude**\n\n```\n{_preview(content, 8)}\n```"
 
 
+@functools.lru_cache(maxsize=64)
 def format_exit_text(window_name: str) -> str:
     """Format a Claude exit notification."""
     return f"Claude has exited in **{window_name}**"
@@ -14,6 +14,12 @@ from ..security.input_sanitizer import DEFAULT_MAX_LENGTH, sanitize_tmux_input
 logger = logging.getLogger(__name__)
 
 
+def _first_word(text: str) -> str:
+    """First whitespace-delimited token of *text* ("" if none), split once."""
+    head = text.split(maxsplit=1)
+    return head[0] if head else ""
+
+
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle regular text messages — forward to Claude in the right tmux window."""
     bot_data = context.bot_data
@@ -38,7 +44,6 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return
 
-    settings = get_settings()
     session_mgr = bot_data.get("session_manager")
     tmux_mgr = bot_data.get("tmux_manager")
     rate_limiter = bot_data.get("rate_limiter")
@@ -67,8 +72,10 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     # Check blocked commands
-    first_word = text.split()[0] if text.split() else ""
-    if first_word in settings.blocked_commands:
+    first_word = _first_word(text)
+    # Bound into bot_data at startup; settings only if run outside the bot
+    blocked = bot_data.get("blocked_commands") or get_settings().blocked_commands
+    if first_word in blocked:
         await update.message.reply_text(
             f"`{first_word}` est une commande interactive, non supportee via Telegram.",
             parse_mode="Markdown",
@@ -88,8 +95,13 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             sanitized_len=len(text),
         )
 
+    # Messages joining a batch that is still open share its single tmux send;
+    # anything that will start a new send goes through the flood guard
+    batcher = bot_data.get("message_batcher")
+    joining = batcher is not None and batcher.would_join(info.window_name, text)
+
     # P1-SEC6: Tmux flood protection
-    if rate_limiter and not rate_limiter.check_tmux_flood(info.window_name):
+    if not joining and rate_limiter and not rate_limiter.check_tmux_flood(info.window_name):
         if audit:
             await audit.log_tmux_flood(
                 user_id=user_id,
@@ -102,7 +114,10 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     # Send to tmux
     try:
         info.touch()
-        await tmux_mgr.send_message(info.window_name, text)
+        if batcher:
+            await batcher.enqueue(info.window_name, text)
+        else:
+            await tmux_mgr.send_message(info.window_name, text)
         logger.info("Sent to '%s': %s", info.window_name, text[:80])
 
         # P1-SEC8: Start typing indicator immediately after send
@@ -130,7 +145,6 @@ async def handle_forward_command(update: Update, context: ContextTypes.DEFAULT_T
     if not text:
         return
 
-    settings = get_settings()
     bot_data = context.bot_data
     session_mgr = bot_data.get("session_manager")
     tmux_mgr = bot_data.get("tmux_manager")
@@ -140,8 +154,10 @@ async def handle_forward_command(update: Update, context: ContextTypes.DEFAULT_T
     topic_id = update.message.message_thread_id or 0
 
     # Check blocked commands
-    first_word = text.split()[0] if text.split() else ""
-    if first_word in settings.blocked_commands:
+    first_word = _first_word(text)
+    # Bound into bot_data at startup; settings only if run outside the bot
+    blocked = bot_data.get("blocked_commands") or get_settings().blocked_commands
+    if first_word in blocked:
         await update.message.reply_text(
             f"`{first_word}` est une commande interactive, non supportee via Telegram.",
             parse_mode="Markdown",
@@ -167,6 +183,10 @@ async def handle_forward_command(update: Update, context: ContextTypes.DEFAULT_T
         return
 
     try:
+        # Text still waiting in the batcher must reach Claude before the command
+        batcher = bot_data.get("message_batcher")
+        if batcher:
+            await batcher.flush(info.window_name)
         await tmux_mgr.send_message(info.window_name, text)
         logger.info("Forwarded command to '%s': %s", info.window_name, text[:80])
     except Exception:
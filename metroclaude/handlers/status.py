@@ -30,35 +30,78 @@ SPINNER_CHARS = {"·", "✻", "✽", "✶", "⠋", "⠙", "⠹", "⠸", "⠼", "
 # Spinner chars used in status line (subset — no braille, these are text spinners)
 STATUS_SPINNERS = frozenset({"·", "✻", "✽", "✶", "✳", "✢"})
 
-# Prompt patterns — Claude Code shows these when waiting for input
+# Any spinner char, found in one C-level scan instead of one `in` per char
+_SPINNER_RE = re.compile("[" + "".join(re.escape(c) for c in sorted(SPINNER_CHARS)) + "]")
+
+# Status line: optional indent, a status spinner, then the description
+_STATUS_LINE_RE = re.compile(
+    r"\s*[" + "".join(re.escape(c) for c in sorted(STATUS_SPINNERS)) + r"](.*)"
+)
+
+# Prompt patterns — Claude Code shows these when waiting for input; one
+# fullmatch per line covers all the cases detect_claude_prompt accepts
 _PROMPT_RE = re.compile(
-    r"^(?:"
-    r">"  # bare ">"
+    r"\s*(?:"
+    # Short (< 20 chars) string ending with ">" — e.g. ">", "claude>",
+    # "project>" — excluding HTML tags ("<...") and shell redirects (">>")
+    r"(?=[^\s<])(?:(?!>>).){0,18}>"
     r"|claude\s*>"  # "claude>" or "claude >"
-    r"|[a-zA-Z0-9._-]+>"  # "project-name>" style prompts
-    r")$"
+    r"|[a-zA-Z0-9._-]+>"  # "project-name>" style prompts, any length
+    r")\s*"
 )
 
+# Detectors only look near the bottom of the pane: slice this many chars
+# off the end before splitting instead of splitting the whole capture
+_TAIL_CHARS = 4096
+# Interactive UIs span more of the screen (top marker to bottom marker)
+_UI_SCAN_CHARS = 16384
+
 # Shell prompts — if we see these instead of Claude, Claude has exited
 _SHELL_COMMANDS = frozenset({"bash", "zsh", "sh", "fish", "dash", "ksh", "tcsh"})
 
-# Interactive UI top markers (simplified from ccbot UIPattern)
-_INTERACTIVE_UI_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
-    ("ExitPlanMode", re.compile(r"^\s*Would you like to proceed\?")),
-    ("ExitPlanMode", re.compile(r"^\s*Claude has written up a plan")),
-    ("PermissionPrompt", re.compile(r"^\s*Do you want to proceed\?")),
-    ("AskUserQuestion", re.compile(r"^\s*[←]?\s*[☐✔☒]")),
-    ("RestoreCheckpoint", re.compile(r"^\s*Restore the code")),
+# Pane commands while Claude Code is running (it runs on Node.js)
+_CLAUDE_COMMANDS = frozenset({"claude", "node"})
+
+# Interactive UI top markers (simplified from ccbot UIPattern), in priority
+# order, as they appear after the line's indentation
+_INTERACTIVE_UI_PATTERNS: list[tuple[str, str]] = [
+    ("ExitPlanMode", r"Would you like to proceed\?"),
+    ("ExitPlanMode", r"Claude has written up a plan"),
+    ("PermissionPrompt", r"Do you want to proceed\?"),
+    ("AskUserQuestion", r"[←]?[^\S\n]*[☐✔☒]"),
+    ("RestoreCheckpoint", r"Restore the code"),
 ]
 
-# Interactive UI bottom markers (confirmation that an interactive UI is active)
-_INTERACTIVE_UI_BOTTOM: list[re.Pattern[str]] = [
-    re.compile(r"^\s*ctrl-g to edit"),
-    re.compile(r"^\s*Esc to (cancel|exit)"),
-    re.compile(r"^\s*Enter to (select|continue)"),
-    re.compile(r"^\s*Allow|Deny"),
-    re.compile(r"^\s*Yes|No"),
-]
+# The line anchor and indentation are shared and possessive ([^\S\n]*+ is
+# whitespace that cannot run past the end of the line and is never given
+# back), so at every position other than a line start the scan fails on "^"
+# alone instead of retrying each alternative.
+_UI_LINE_START = r"^[^\S\n]*+"
+
+# All top markers fused into one pass; group _<i> identifies the pattern
+_UI_TOP_RE = re.compile(
+    _UI_LINE_START
+    + "(?:"
+    + "|".join(f"(?P<_{i}>{p})" for i, (_, p) in enumerate(_INTERACTIVE_UI_PATTERNS))
+    + ")",
+    re.MULTILINE,
+)
+_UI_TOP_NAMES = {f"_{i}": name for i, (name, _) in enumerate(_INTERACTIVE_UI_PATTERNS)}
+_ASKUSER_TOP_RE = re.compile(
+    _UI_LINE_START
+    + "(?:"
+    + "|".join(p for name, p in _INTERACTIVE_UI_PATTERNS if name == "AskUserQuestion")
+    + ")",
+    re.MULTILINE,
+)
+
+# Interactive UI bottom markers (confirmation that an interactive UI is
+# active). "Deny" and "No" match anywhere in a line.
+_UI_BOTTOM_RE = re.compile(
+    r"^\s*+(?:ctrl-g to edit|Esc to (?:cancel|exit)|Enter to (?:select|continue)|Allow|Yes)"
+    r"|Deny|No",
+    re.MULTILINE,
+)
 
 
 @dataclass
@@ -69,48 +112,93 @@ class InteractiveUIInfo:
     content: str  # Extracted text between top and bottom markers
 
 
+# Delay before a new typing indicator's first send (seconds)
+_TYPING_DEBOUNCE = 0.5
+
+
 class TypingManager:
-    """Manage Telegram typing indicator for active sessions."""
+    """Manage Telegram typing indicator for active sessions.
+
+    One pump task refreshes every active chat/topic together on a single
+    timer (Telegram shows the action for ~5s). A newly started indicator is
+    first sent after _TYPING_DEBOUNCE, so replies that arrive sooner cost
+    no send_chat_action call at all.
+    """
 
     def __init__(self, bot: Bot) -> None:
         self._bot = bot
-        self._active: dict[str, asyncio.Task] = {}  # key = "chatid:topicid"
+        self._active: dict[tuple[int, int], tuple[int, int | None]] = {}  # (chat, topic)
+        self._pump_task: asyncio.Task | None = None
+        self._warming: set[tuple[int, int]] = set()  # started, first send not yet due
+        self._pending: set[asyncio.Task] = set()  # first sends (strong refs)
 
     def start_typing(self, chat_id: int, topic_id: int | None = None) -> None:
         """Start showing typing indicator for a chat/topic."""
-        key = f"{chat_id}:{topic_id or 0}"
-        if key in self._active and not self._active[key].done():
+        key = (chat_id, topic_id or 0)
+        if key in self._active:
             return
-        self._active[key] = asyncio.create_task(self._typing_loop(chat_id, topic_id))
+        self._active[key] = (chat_id, topic_id)
+        self._warming.add(key)
+        task = asyncio.create_task(self._first_typing(key))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
 
     def stop_typing(self, chat_id: int, topic_id: int | None = None) -> None:
         """Stop showing typing indicator."""
-        key = f"{chat_id}:{topic_id or 0}"
-        task = self._active.pop(key, None)
-        if task and not task.done():
-            task.cancel()
+        key = (chat_id, topic_id or 0)
+        self._active.pop(key, None)
+        self._warming.discard(key)
+
+    async def _first_typing(self, key: tuple[int, int]) -> None:
+        """First send for a new indicator; skipped if it was stopped meanwhile."""
+        await asyncio.sleep(_TYPING_DEBOUNCE)
+        if key in self._warming:
+            self._warming.discard(key)
+            await self._send_typing(*self._active[key])
+
+    async def _send_typing(self, chat_id: int, topic_id: int | None) -> None:
+        kwargs = {"chat_id": chat_id, "action": "typing"}
+        if topic_id:
+            kwargs["message_thread_id"] = topic_id
+        try:
+            await self._bot.send_chat_action(**kwargs)
+        except Exception as e:
+            logger.debug("Typing action error: %s", e)
 
-    async def _typing_loop(self, chat_id: int, topic_id: int | None) -> None:
-        """Send typing action every 4 seconds (Telegram shows it for ~5s)."""
+    async def _pump(self) -> None:
+        """Re-send typing for all active chats every 4 seconds until none are left."""
         try:
             while True:
-                kwargs = {"chat_id": chat_id, "action": "typing"}
-                if topic_id:
-                    kwargs["message_thread_id"] = topic_id
-                try:
-                    await self._bot.send_chat_action(**kwargs)
-                except Exception as e:
-                    logger.debug("Typing action error: %s", e)
                 await asyncio.sleep(4)
+                if not self._active:
+                    return
+                due = [v for k, v in self._active.items() if k not in self._warming]
+                await asyncio.gather(*(self._send_typing(c, t) for c, t in due))
         except asyncio.CancelledError:
             pass
 
     def stop_all(self) -> None:
         """Stop all typing indicators."""
-        for task in self._active.values():
-            if not task.done():
-                task.cancel()
         self._active.clear()
+        self._warming.clear()
+        if self._pump_task and not self._pump_task.done():
+            self._pump_task.cancel()
+        for task in self._pending:
+            task.cancel()
+
+
+def _tail_lines(terminal_content: str, n: int) -> list[str]:
+    """Last *n* lines of the capture, trailing whitespace dropped.
+
+    Splits only the last _TAIL_CHARS chars unless those hold fewer than *n*
+    lines (very long lines), in which case the whole capture is used.
+    """
+    tail = terminal_content[-_TAIL_CHARS:].rstrip()
+    if len(terminal_content) > _TAIL_CHARS and tail.count("\n") < n:
+        tail = terminal_content.rstrip()
+    return tail.rsplit("\n", n)[-n:]
 
 
 def detect_spinner(terminal_content: str) -> bool:
@@ -118,12 +206,8 @@ def detect_spinner(terminal_content: str) -> bool:
     if not terminal_content:
         return False
     # Check last few lines for spinner chars
-    last_lines = terminal_content.strip().split("\n")[-3:]
-    for line in last_lines:
-        for char in SPINNER_CHARS:
-            if char in line:
-                return True
-    return False
+    last_lines = _tail_lines(terminal_content, 3)
+    return any(_SPINNER_RE.search(line) for line in last_lines)
 
 
 def detect_claude_prompt(terminal_content: str) -> bool:
@@ -136,24 +220,7 @@ def detect_claude_prompt(terminal_content: str) -> bool:
     """
     if not terminal_content:
         return False
-    last_lines = terminal_content.strip().split("\n")[-3:]
-    for line in last_lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-        # Exact match for bare prompt
-        if stripped == ">":
-            return True
-        # Short string ending with ">" — e.g. "claude>", "project>"
-        # Parentheses fix P1-SEC11: explicit grouping for clarity
-        if stripped.endswith(">") and len(stripped) < 20:
-            # Exclude lines that look like HTML tags or shell redirects
-            if not stripped.startswith("<") and ">>" not in stripped:
-                return True
-        # Regex match for known prompt formats
-        if _PROMPT_RE.match(stripped):
-            return True
-    return False
+    return any(_PROMPT_RE.fullmatch(line) for line in _tail_lines(terminal_content, 3))
 
 
 def detect_interactive_ui(terminal_content: str) -> InteractiveUIInfo | None:
@@ -168,25 +235,26 @@ def detect_interactive_ui(terminal_content: str) -> InteractiveUIInfo | None:
     if not terminal_content:
         return None
 
-    lines = terminal_content.strip().split("\n")
-
-    # Scan for top markers
-    for i, line in enumerate(lines):
-        for name, pattern in _INTERACTIVE_UI_PATTERNS:
-            if pattern.search(line):
-                # Found a top marker — check remaining lines for bottom markers
-                remaining = lines[i + 1 :]
-                has_bottom = False
-                for rline in remaining:
-                    if any(bp.search(rline) for bp in _INTERACTIVE_UI_BOTTOM):
-                        has_bottom = True
-                        break
-
-                # For AskUserQuestion, bottom marker is optional (multi-tab)
-                if has_bottom or name == "AskUserQuestion":
-                    content = "\n".join(lines[i:]).rstrip()
-                    return InteractiveUIInfo(name=name, content=content)
+    if len(terminal_content) > _UI_SCAN_CHARS:
+        # Bound the scan; drop the partial first line of the slice
+        terminal_content = terminal_content[-_UI_SCAN_CHARS:]
+        terminal_content = terminal_content[terminal_content.find("\n") + 1 :]
+    text = terminal_content.strip()
 
+    # First top marker; a bottom marker must follow on a later line
+    top = _UI_TOP_RE.search(text)
+    if not top:
+        return None
+    start = top.start()
+    line_end = text.find("\n", start)
+    if line_end >= 0 and _UI_BOTTOM_RE.search(text, line_end + 1):
+        return InteractiveUIInfo(name=_UI_TOP_NAMES[top.lastgroup], content=text[start:])
+
+    # No bottom marker below this line, so none below any later line either:
+    # only AskUserQuestion (bottom marker optional, multi-tab) can still match
+    ask = _ASKUSER_TOP_RE.search(text, start)
+    if ask:
+        return InteractiveUIInfo(name="AskUserQuestion", content=text[ask.start() :])
     return None
 
 
@@ -210,13 +278,11 @@ def detect_claude_exit(pane_current_command: str | None) -> bool:
         return False
     cmd = pane_current_command.strip().lower()
     # Claude process names: "claude", "node" (Claude runs on Node.js)
-    if cmd in ("claude", "node"):
+    if cmd in _CLAUDE_COMMANDS:
         return False
-    # If pane command is a known shell, Claude has exited
-    if cmd in _SHELL_COMMANDS:
-        return True
+    # If pane command is a known shell, Claude has exited.
     # Unknown command — could be a subprocess, don't flag as exit
-    return False
+    return cmd in _SHELL_COMMANDS
 
 
 def parse_status_line(terminal_content: str) -> str | None:
@@ -232,12 +298,9 @@ def parse_status_line(terminal_content: str) -> str | None:
     if not terminal_content:
         return None
 
-    lines = terminal_content.strip().split("\n")
     # Search bottom 15 lines, reversed (status line is near bottom)
-    for line in reversed(lines[-15:]):
-        stripped = line.strip()
-        if not stripped:
-            continue
-        if stripped[0] in STATUS_SPINNERS:
-            return stripped[1:].strip()
+    for line in reversed(_tail_lines(terminal_content, 15)):
+        m = _STATUS_LINE_RE.match(line)
+        if m:
+            return m.group(1).strip()
     return None
@@ -27,6 +27,7 @@ Empty string or "*" or omitting matcher entirely → match all.
 
 from __future__ import annotations
 
+import contextlib
 import fcntl
 import json
 import logging
@@ -34,14 +35,31 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
+from collections.abc import Iterator
 from pathlib import Path
 
+from .utils import fastjson
+from .utils.fsio import fsync_dir
+
 logger = logging.getLogger(__name__)
 
 # Where the session map is stored
 SESSION_MAP_FILE = Path.home() / ".metroclaude" / "session_map.json"
 SESSION_MAP_LOCK = SESSION_MAP_FILE.with_suffix(".lock")
 
+# Machine-read file: compact JSON unless METROCLAUDE_PRETTY_JSON is set
+_PRETTY_JSON = bool(os.environ.get("METROCLAUDE_PRETTY_JSON"))
+
+# Last parsed session map: ((path, signature), data) — see read_session_map
+_map_cache: tuple[tuple[Path, tuple[int, int, int]], dict] | None = None
+
+# Lock file descriptors, opened once per lock path and reused (see _map_lock)
+_lock_fds: dict[Path, int] = {}
+# flock() does not exclude holders of the same fd, so threads of this
+# process are serialized here before taking the file lock
+_lock_mutex = threading.Lock()
+
 # Canonical name of the hook script (co-located with this module)
 _HOOK_SCRIPT_NAME = "hooks_session_start.py"
 
@@ -150,31 +168,97 @@ def register_hook() -> None:
     logger.info("Registered SessionStart hook: %s", new_command)
 
 
+def _lock_fd() -> int:
+    """Cached fd for SESSION_MAP_LOCK, reopened if the file was deleted or replaced.
+
+    The hook opens the path fresh each time; flocking an unlinked inode
+    would no longer exclude it. Caller holds _lock_mutex.
+    """
+    fd = _lock_fds.get(SESSION_MAP_LOCK)
+    if fd is not None:
+        try:
+            st = os.stat(SESSION_MAP_LOCK)
+        except FileNotFoundError:
+            st = None
+        held = os.fstat(fd)
+        if st is not None and (st.st_ino, st.st_dev) == (held.st_ino, held.st_dev):
+            return fd
+        del _lock_fds[SESSION_MAP_LOCK]
+        os.close(fd)
+    fd = os.open(SESSION_MAP_LOCK, os.O_CREAT | os.O_RDWR, 0o644)
+    _lock_fds[SESSION_MAP_LOCK] = fd
+    return fd
+
+
+@contextlib.contextmanager
+def _map_lock(operation: int) -> Iterator[None]:
+    """Hold an flock (LOCK_SH or LOCK_EX) on SESSION_MAP_LOCK.
+
+    The lock file is opened once and its fd kept, instead of an
+    open/close pair around every read and write. Raises OSError if the
+    lock file cannot be opened or locked.
+    """
+    with _lock_mutex:
+        fd = _lock_fd()
+        fcntl.flock(fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def session_map_signature() -> tuple[int, int, int] | None:
+    """Cheap change check for the session map: (inode, mtime_ns, size).
+
+    Writers replace the file atomically, so the inode changes on every
+    write even where mtime resolution is coarse. None if missing.
+    """
+    try:
+        st = SESSION_MAP_FILE.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
 def read_session_map() -> dict:
     """Read the session map file with shared lock.
 
     Uses fcntl.LOCK_SH (shared/read lock) so multiple readers can
     proceed concurrently, but writers (hook script) hold LOCK_EX
     which blocks readers until the write is complete.
+
+    The parsed map is cached against the file's signature (see
+    session_map_signature), so unchanged files are not re-read; callers
+    get a shallow copy they may modify.
     """
-    if not SESSION_MAP_FILE.exists():
+    global _map_cache
+    signature = session_map_signature()
+    if signature is None:
         return {}
+    key = (SESSION_MAP_FILE, signature)
+    if _map_cache is not None and _map_cache[0] == key:
+        return dict(_map_cache[1])
     try:
-        with open(SESSION_MAP_LOCK, "w") as lock_f:
-            fcntl.flock(lock_f, fcntl.LOCK_SH)
+        with _map_lock(fcntl.LOCK_SH):
             try:
-                return json.loads(SESSION_MAP_FILE.read_text())
-            except (json.JSONDecodeError, OSError):
+                data = fastjson.loads(SESSION_MAP_FILE.read_bytes())
+            except (fastjson.JSONDecodeError, OSError):
                 return {}
-            finally:
-                fcntl.flock(lock_f, fcntl.LOCK_UN)
     except OSError as e:
         logger.warning("Failed to acquire read lock on session_map: %s", e)
         # Fallback: read without lock (better than no data)
         try:
-            return json.loads(SESSION_MAP_FILE.read_text())
-        except (json.JSONDecodeError, OSError):
+            return fastjson.loads(SESSION_MAP_FILE.read_bytes())
+        except (fastjson.JSONDecodeError, OSError):
             return {}
+    _map_cache = (key, data)
+    return dict(data)
+
+
+def _map_key_window(key: str) -> str:
+    """Window part of a "session:window" key (the whole key if unqualified)."""
+    _, sep, window_name = key.partition(":")
+    return window_name if sep else key
 
 
 def cleanup_stale_map_entries(live_windows: set[str]) -> int:
@@ -188,13 +272,7 @@ def cleanup_stale_map_entries(live_windows: set[str]) -> int:
     data = read_session_map()
     if not data:
         return 0
-    stale_keys = []
-    for k in data:
-        # Extract window name from "session:window" key
-        parts = k.split(":", 1)
-        window_name = parts[1] if len(parts) > 1 else k
-        if window_name not in live_windows:
-            stale_keys.append(k)
+    stale_keys = [k for k in data if _map_key_window(k) not in live_windows]
     if not stale_keys:
         return 0
     for k in stale_keys:
@@ -208,31 +286,37 @@ def write_session_map(data: dict) -> None:
     """Write to the session map file with exclusive lock + atomic write.
 
     Uses fcntl.LOCK_EX (exclusive lock) to prevent concurrent writes.
-    Writes to a temp file first, then atomically replaces via os.replace().
+    Writes to a temp file first, then atomically replaces via os.replace()
+    and fsyncs the directory so the rename is durable. The written map
+    becomes the read cache, so the next read_session_map does not re-parse
+    what this process just wrote.
     """
+    global _map_cache
+    _map_cache = None
     SESSION_MAP_FILE.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with open(SESSION_MAP_LOCK, "w") as lock_f:
-            fcntl.flock(lock_f, fcntl.LOCK_EX)
+        with _map_lock(fcntl.LOCK_EX):
+            fd, tmp_path = tempfile.mkstemp(
+                dir=SESSION_MAP_FILE.parent,
+                prefix=".session_map_",
+                suffix=".tmp",
+            )
             try:
-                fd, tmp_path = tempfile.mkstemp(
-                    dir=SESSION_MAP_FILE.parent,
-                    prefix=".session_map_",
-                    suffix=".tmp",
-                )
+                with os.fdopen(fd, "wb") as f:
+                    f.write(fastjson.dumps(data, pretty=_PRETTY_JSON))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, SESSION_MAP_FILE)
+            except BaseException:
                 try:
-                    with os.fdopen(fd, "w") as f:
-                        json.dump(data, f, indent=2)
-                        f.flush()
-                        os.fsync(f.fileno())
-                    os.replace(tmp_path, SESSION_MAP_FILE)
-                except BaseException:
-                    try:
-                        os.unlink(tmp_path)
-                    except OSError:
-                        pass
-                    raise
-            finally:
-                fcntl.flock(lock_f, fcntl.LOCK_UN)
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            # Stat under the lock: no other writer can have replaced it yet
+            signature = session_map_signature()
+            if signature is not None:
+                _map_cache = ((SESSION_MAP_FILE, signature), dict(data))
+            fsync_dir(SESSION_MAP_FILE.parent)
     except OSError as e:
         logger.error("Failed to write session_map: %s", e)
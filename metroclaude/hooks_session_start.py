@@ -20,32 +20,69 @@ import re
 import subprocess
 import sys
 import tempfile
-from pathlib import Path
 
-SESSION_MAP_FILE = Path.home() / ".metroclaude" / "session_map.json"
-SESSION_MAP_LOCK = SESSION_MAP_FILE.with_suffix(".lock")
+# Optional: this script may run under an interpreter without the ``fast`` extra
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Plain strings: this script runs once per session start, and os.path on str
+# avoids building pathlib objects it only passes straight to syscalls
+SESSION_MAP_DIR = os.path.join(os.path.expanduser("~"), ".metroclaude")
+SESSION_MAP_FILE = os.path.join(SESSION_MAP_DIR, "session_map.json")
+SESSION_MAP_LOCK = os.path.join(SESSION_MAP_DIR, "session_map.lock")
 
 # UUID v4 pattern (lowercase hex, as produced by Claude Code)
 _UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+_UUID_MATCH = _UUID_RE.match
 
 
 def _is_valid_session_id(value: str) -> bool:
-    """Validate that session_id looks like a UUID."""
-    return bool(_UUID_RE.match(value))
+    """Validate that session_id looks like a UUID.
+
+    The fixed length also rejects a trailing newline, which ``$`` would accept.
+    """
+    return len(value) == 36 and value.count("-") == 4 and _UUID_MATCH(value) is not None
+
+
+def _loads(raw: bytes) -> dict:
+    """Parse the map; stdlib json takes what orjson rejects (lone surrogates, bad UTF-8)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw.decode("utf-8", "replace"))
+
+
+def _dumps(data: dict) -> bytes:
+    """Encode *data* compactly, or indented if METROCLAUDE_PRETTY_JSON is set."""
+    pretty = bool(os.environ.get("METROCLAUDE_PRETTY_JSON"))
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except orjson.JSONEncodeError:
+            pass  # e.g. lone surrogates: stdlib escapes them
+    if pretty:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
 
 
-def _atomic_write_json(path: Path, data: dict) -> None:
+def _atomic_write_json(path: str, data: dict) -> None:
     """Write JSON to path atomically via temp file + os.replace().
 
     Writes to a temp file in the same directory, then atomically
     replaces the target. This prevents partial reads if the process
-    is killed mid-write.
+    is killed mid-write. The directory is fsynced afterwards so the
+    rename itself survives a crash.
     """
-    path.parent.mkdir(parents=True, exist_ok=True)
-    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".session_map_", suffix=".tmp")
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=parent, prefix=".session_map_", suffix=".tmp")
     try:
-        with os.fdopen(fd, "w") as f:
-            json.dump(data, f, indent=2)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dumps(data))
             f.flush()
             os.fsync(f.fileno())
         os.replace(tmp_path, path)
@@ -56,6 +93,12 @@ def _atomic_write_json(path: Path, data: dict) -> None:
         except OSError:
             pass
         raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 
 def main() -> None:
@@ -88,20 +131,21 @@ def main() -> None:
         pass
 
     # Ensure directory exists before acquiring lock
-    SESSION_MAP_FILE.parent.mkdir(parents=True, exist_ok=True)
+    os.makedirs(SESSION_MAP_DIR, exist_ok=True)
 
     # Acquire exclusive lock, read-modify-write, release (pattern from ccbot)
     try:
         with open(SESSION_MAP_LOCK, "w") as lock_f:
             fcntl.flock(lock_f, fcntl.LOCK_EX)
             try:
-                # Read existing map
+                # Read existing map (missing or corrupt -> start empty)
                 data: dict = {}
-                if SESSION_MAP_FILE.exists():
-                    try:
-                        data = json.loads(SESSION_MAP_FILE.read_text())
-                    except (json.JSONDecodeError, OSError):
-                        data = {}
+                try:
+                    with open(SESSION_MAP_FILE, "rb") as f:
+                        raw = f.read()
+                    data = _loads(raw)
+                except (ValueError, OSError):
+                    data = {}
 
                 # Store mapping: key = "session:window" (e.g. "metroclaude:general")
                 # P1-H3: Always use session_name:window_name format
@@ -115,14 +159,17 @@ def main() -> None:
                     key = f"metroclaude:pane-{pane_id.lstrip('%')}"
                 else:
                     key = f"metroclaude:session-{session_id[:8]}"
-                data[key] = {
+                entry = {
                     "session_id": session_id,
                     "cwd": cwd,
                     "window_name": window_name,
                 }
-
-                # Atomic write (P1-H1)
-                _atomic_write_json(SESSION_MAP_FILE, data)
+                # Resume/compact re-fire the hook with the same mapping:
+                # nothing to persist, skip the write + fsyncs
+                if data.get(key) != entry:
+                    data[key] = entry
+                    # Atomic write (P1-H1)
+                    _atomic_write_json(SESSION_MAP_FILE, data)
             finally:
                 fcntl.flock(lock_f, fcntl.LOCK_UN)
     except OSError:
@@ -8,6 +8,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+import sys
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -15,8 +17,24 @@ from pathlib import Path
 from .config import get_settings
 from .parser import ParsedEvent, parse_jsonl_line
 
+try:
+    from inotify_simple import INotify
+except ImportError:  # optional ``fast`` extra (Linux only)
+    INotify = None
+
 logger = logging.getLogger(__name__)
 
+# inotify(7) event bits (stable kernel ABI)
+_IN_MODIFY = 0x00000002
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_WATCH_MASK = _IN_MODIFY | _IN_MOVED_TO | _IN_CREATE
+
+# Claude Code names project dirs by replacing every non-alphanumeric char with '-'
+_PROJECT_DIR_RE = re.compile(r"[^a-zA-Z0-9]")
+
 
 @dataclass
 class MonitoredFile:
@@ -25,7 +43,7 @@ class MonitoredFile:
     path: Path
     byte_offset: int = 0
     last_mtime: float = 0.0
-    partial_line: str = ""  # Incomplete JSON at EOF
+    partial: bytearray = field(default_factory=bytearray)  # Incomplete JSON at EOF
 
 
 @dataclass
@@ -70,7 +88,7 @@ class SessionMonitor:
                 file_size,
             )
             self._file.byte_offset = 0
-            self._file.partial_line = ""
+            self._file.partial.clear()
 
         # Skip if no new bytes
         if file_size <= self._file.byte_offset:
@@ -86,19 +104,21 @@ class SessionMonitor:
             logger.warning("Error reading %s: %s", path, e)
             return []
 
-        text = self._file.partial_line + new_data.decode("utf-8", errors="replace")
-        lines = text.split("\n")
-
-        # Last element might be incomplete — save for next cycle
-        self._file.partial_line = lines[-1] if lines else ""
-        complete_lines = lines[:-1]
-
-        for line in complete_lines:
-            line = line.strip()
-            if not line:
+        # Buffer raw bytes so a UTF-8 sequence split across writes decodes intact;
+        # complete lines go to the parser undecoded (orjson parses bytes directly)
+        buf = self._file.partial
+        buf += new_data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            return []  # Still mid-line — keep buffering
+        complete = bytes(buf[:end])
+        del buf[: end + 1]
+
+        for raw in complete.split(b"\n"):
+            raw = raw.strip()
+            if not raw:
                 continue
-            parsed = parse_jsonl_line(line)
-            events.extend(parsed)
+            events.extend(parse_jsonl_line(raw))
 
         return events
 
@@ -113,7 +133,7 @@ class SessionMonitor:
                 self._file = MonitoredFile(path=path)
             self._file.byte_offset = size
             self._file.last_mtime = path.stat().st_mtime
-            self._file.partial_line = ""
+            self._file.partial.clear()
             logger.info("Skipped to end of %s (offset=%d)", path.name, size)
         except OSError:
             pass
@@ -128,6 +148,12 @@ class MonitorPool:
         self._running = False
         self._task: asyncio.Task | None = None
         self._settings = get_settings()
+        # With inotify, only sessions whose JSONL was written get polled (no
+        # idle stat() calls). Unwatched dirs fall back to polling every cycle.
+        self._inotify = INotify() if INotify is not None and sys.platform == "linux" else None
+        self._watches: dict[Path, int] = {}  # project_dir -> watch descriptor
+        self._dirty: set[str] = set()  # sessions to poll regardless of inotify
+        self._project_dirs: dict[str, Path] = {}  # session_id -> dir holding its JSONL
 
     def add_session(
         self,
@@ -146,12 +172,51 @@ class MonitorPool:
         if skip_existing:
             monitor.skip_to_end()
         self._monitors[session_id] = monitor
+        self._dirty.add(session_id)
+        self._watch(project_dir)
         logger.info("Monitoring session %s in %s", session_id, project_dir)
         return monitor
 
     def remove_session(self, session_id: str) -> None:
         """Stop monitoring a session."""
-        self._monitors.pop(session_id, None)
+        monitor = self._monitors.pop(session_id, None)
+        if monitor is None or self._inotify is None:
+            return
+        project_dir = monitor.project_dir
+        if any(m.project_dir == project_dir for m in self._monitors.values()):
+            return
+        wd = self._watches.pop(project_dir, None)
+        if wd is not None:
+            try:
+                self._inotify.rm_watch(wd)
+            except OSError:
+                pass
+
+    def _watch(self, project_dir: Path) -> None:
+        """Start an inotify watch on *project_dir* (no-op without inotify)."""
+        if self._inotify is None or project_dir in self._watches:
+            return
+        try:
+            self._watches[project_dir] = self._inotify.add_watch(project_dir, _WATCH_MASK)
+        except OSError:
+            pass  # Dir not created yet, or watch limit reached — keep polling it
+
+    def _changed_sessions(self) -> set[str] | None:
+        """Sessions with JSONL writes since the last call, or None to poll all."""
+        if self._inotify is None:
+            return None
+        changed, self._dirty = self._dirty, set()
+        for event in self._inotify.read(timeout=0):
+            if event.mask & _IN_Q_OVERFLOW:
+                return None  # Events were dropped
+            if event.mask & _IN_IGNORED:
+                # Watched dir was deleted: drop the watch, poll it until re-added
+                for project_dir, wd in list(self._watches.items()):
+                    if wd == event.wd:
+                        del self._watches[project_dir]
+            elif event.name.endswith(".jsonl"):
+                changed.add(event.name[:-6])
+        return changed
 
     def on_events(self, callback: Callable[[str, list[ParsedEvent]], None]) -> None:
         """Register a callback for new events. Called with (session_id, events)."""
@@ -174,21 +239,43 @@ class MonitorPool:
                 pass
         logger.info("Monitor pool stopped")
 
+    def _poll_all(self) -> list[tuple[str, list[ParsedEvent]]]:
+        """Poll every monitor (runs in a worker thread). Returns sessions with events."""
+        results: list[tuple[str, list[ParsedEvent]]] = []
+        changed = self._changed_sessions()
+        for session_id, monitor in list(self._monitors.items()):
+            if changed is not None and session_id not in changed:
+                if monitor.project_dir in self._watches:
+                    continue
+                self._watch(monitor.project_dir)  # Dir may exist by now
+            try:
+                events = monitor.poll()
+            except Exception:
+                logger.exception("Poll error for session %s", session_id)
+                continue
+            if events:
+                results.append((session_id, events))
+        return results
+
     async def _poll_loop(self) -> None:
-        """Main polling loop — check all monitored files."""
+        """Main polling loop — check all monitored files.
+
+        All monitors are polled in a single thread hop per interval; callbacks
+        then run on the event loop.
+        """
         while self._running:
-            for session_id, monitor in list(self._monitors.items()):
-                try:
-                    events = await asyncio.to_thread(monitor.poll)
-                    if events:
-                        logger.info("Polled %d event(s) from session %s", len(events), session_id)
-                        for cb in self._callbacks:
-                            try:
-                                cb(session_id, events)
-                            except Exception:
-                                logger.exception("Callback error for session %s", session_id)
-                except Exception:
-                    logger.exception("Poll error for session %s", session_id)
+            try:
+                results = await asyncio.to_thread(self._poll_all)
+            except Exception:
+                logger.exception("Poll error")
+                results = []
+            for session_id, events in results:
+                logger.debug("Polled %d event(s) from session %s", len(events), session_id)
+                for cb in self._callbacks:
+                    try:
+                        cb(session_id, events)
+                    except Exception:
+                        logger.exception("Callback error for session %s", session_id)
 
             await asyncio.sleep(self._settings.monitor_poll_interval)
 
@@ -196,33 +283,43 @@ class MonitorPool:
         """Find which project directory contains this session ID.
 
         Strategy:
-        1. Scan all project dirs for the exact JSONL file
-        2. Fall back to working_dir-derived project dir (even if JSONL
-           doesn't exist yet — Claude creates it after first interaction)
+        1. The working_dir-derived project dir, if it holds the JSONL
+        2. Scan all project dirs for the exact JSONL file
+        3. Fall back to the derived dir (even if JSONL doesn't exist
+           yet — Claude creates it after first interaction)
+
+        Exact matches are cached per session.
         """
+        cached = self._project_dirs.get(session_id)
+        if cached is not None:
+            return cached
+
         projects_dir = self._settings.claude_projects_dir
+        filename = f"{session_id}.jsonl"
+
+        # 1. Derived dir — the common case, one stat instead of a readdir
+        default = projects_dir / _PROJECT_DIR_RE.sub("-", str(self._settings.working_dir))
+        if (default / filename).is_file():
+            self._project_dirs[session_id] = default
+            return default
+
         if not projects_dir.exists():
             raise FileNotFoundError(f"Claude projects dir not found: {projects_dir}")
 
-        # 1. Exact match: JSONL file exists
+        # 2. Exact match in another project dir
         for project in projects_dir.iterdir():
             if project.is_dir():
-                jsonl = project / f"{session_id}.jsonl"
+                jsonl = project / filename
                 if jsonl.exists():
+                    self._project_dirs[session_id] = project
                     return project
 
-        # 2. Derive from working_dir — Claude Code normalizes paths by
-        #    replacing all non-alphanumeric chars with '-'
-        import re
-
-        wd = str(self._settings.working_dir)
-        normalized = re.sub(r"[^a-zA-Z0-9]", "-", wd)
-        default = projects_dir / normalized
+        # 3. Derived dir without the JSONL
         if default.is_dir():
             logger.debug("Using derived project dir: %s", default)
             return default
 
-        # 3. Last resort: return the derived path anyway (JSONL will appear later)
+        # Last resort: return the derived path anyway (JSONL will appear later)
         logger.warning(
             "Project dir %s not found for session %s, using it anyway (JSONL pending)",
             default,
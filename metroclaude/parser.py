@@ -6,11 +6,13 @@ We extract assistant text and tool summaries for Telegram display.
 
 from __future__ import annotations
 
-import json
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from enum import StrEnum
 
+from .utils import fastjson
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +25,7 @@ class EventType(StrEnum):
     PROGRESS = "progress"
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedEvent:
     event_type: EventType
     content: str = ""
@@ -54,128 +56,145 @@ def _summarize_tool_input(name: str, inputs: dict) -> str:
     """Create a short summary of tool inputs for display."""
     key = _TOOL_SUMMARIES.get(name)
     if key and key in inputs:
-        val = str(inputs[key])
-        if len(val) > 80:
-            val = val[:77] + "..."
-        return val
+        val = inputs[key]
+        if not isinstance(val, str):
+            val = str(val)
+        return val if len(val) <= 80 else val[:77] + "..."
     # Fallback: first string value
     for v in inputs.values():
         if isinstance(v, str) and v:
-            s = v[:80]
-            return s + "..." if len(v) > 80 else s
+            return v if len(v) <= 80 else v[:80] + "..."
     return ""
 
 
-def parse_jsonl_line(line: str) -> list[ParsedEvent]:
-    """Parse a single JSONL line into zero or more events."""
-    line = line.strip()
-    if not line:
-        return []
-
-    try:
-        data = json.loads(line)
-    except json.JSONDecodeError:
-        return []
-
-    msg_type = data.get("type", "")
-    uuid = data.get("uuid", "")
-    timestamp = data.get("timestamp", "")
+def _parse_assistant(data: dict, uuid: str, timestamp: str) -> list[ParsedEvent]:
     events: list[ParsedEvent] = []
+    for block in data.get("message", {}).get("content", []):
+        block_type = block.get("type", "")
 
-    if msg_type == "assistant":
-        message = data.get("message", {})
-        content_blocks = message.get("content", [])
-        for block in content_blocks:
-            block_type = block.get("type", "")
-
-            if block_type == "text":
-                text = block.get("text", "")
-                if text.strip():
-                    events.append(
-                        ParsedEvent(
-                            event_type=EventType.TEXT,
-                            content=text,
-                            uuid=uuid,
-                            timestamp=timestamp,
-                            raw=data,
-                        )
-                    )
-
-            elif block_type == "tool_use":
-                tool_name = block.get("name", "unknown")
-                tool_id = block.get("id", "")
-                tool_input = block.get("input", {})
-                summary = _summarize_tool_input(tool_name, tool_input)
+        if block_type == "text":
+            text = block.get("text", "")
+            if text.strip():
                 events.append(
                     ParsedEvent(
-                        event_type=EventType.TOOL_USE,
-                        tool_name=tool_name,
-                        tool_id=tool_id,
-                        tool_input_summary=summary,
+                        event_type=EventType.TEXT,
+                        content=text,
                         uuid=uuid,
                         timestamp=timestamp,
                         raw=data,
                     )
                 )
 
-            elif block_type == "thinking":
-                # We don't forward thinking to Telegram by default
-                pass
-
-    elif msg_type == "user":
-        message = data.get("message", {})
-        content = message.get("content", "")
-        if isinstance(content, list):
-            for item in content:
-                if item.get("type") == "tool_result":
-                    events.append(
-                        ParsedEvent(
-                            event_type=EventType.TOOL_RESULT,
-                            tool_id=item.get("tool_use_id", ""),
-                            content=_truncate(str(item.get("content", "")), 200),
-                            is_error=item.get("is_error", False),
-                            uuid=uuid,
-                            timestamp=timestamp,
-                            raw=data,
-                        )
-                    )
-
-    elif msg_type == "system":
-        content = data.get("content", "")
-        events.append(
-            ParsedEvent(
-                event_type=EventType.SYSTEM,
-                content=content,
-                uuid=uuid,
-                timestamp=timestamp,
-                raw=data,
+        elif block_type == "tool_use":
+            tool_name = block.get("name", "unknown")
+            tool_id = block.get("id", "")
+            tool_input = block.get("input", {})
+            summary = _summarize_tool_input(tool_name, tool_input)
+            events.append(
+                ParsedEvent(
+                    event_type=EventType.TOOL_USE,
+                    tool_name=tool_name,
+                    tool_id=tool_id,
+                    tool_input_summary=summary,
+                    uuid=uuid,
+                    timestamp=timestamp,
+                    raw=data,
+                )
             )
-        )
 
+        # "thinking" blocks are not forwarded to Telegram by default
     return events
 
 
-def format_event_for_telegram(event: ParsedEvent) -> str | None:
-    """Format a parsed event into a Telegram-friendly string.
+def _parse_user(data: dict, uuid: str, timestamp: str) -> list[ParsedEvent]:
+    content = data.get("message", {}).get("content", "")
+    if not isinstance(content, list):
+        return []
+    return [
+        ParsedEvent(
+            event_type=EventType.TOOL_RESULT,
+            tool_id=item.get("tool_use_id", ""),
+            content=_truncate(str(item.get("content", "")), 200),
+            is_error=item.get("is_error", False),
+            uuid=uuid,
+            timestamp=timestamp,
+            raw=data,
+        )
+        for item in content
+        if item.get("type") == "tool_result"
+    ]
+
+
+def _parse_system(data: dict, uuid: str, timestamp: str) -> list[ParsedEvent]:
+    return [
+        ParsedEvent(
+            event_type=EventType.SYSTEM,
+            content=data.get("content", ""),
+            uuid=uuid,
+            timestamp=timestamp,
+            raw=data,
+        )
+    ]
 
-    Returns None if the event should not be displayed.
-    """
-    if event.event_type == EventType.TEXT:
-        return event.content
 
-    if event.event_type == EventType.TOOL_USE:
-        summary = f"({event.tool_input_summary})" if event.tool_input_summary else ""
-        return f"🔧 **{event.tool_name}**{summary}"
+# One parser per message type that yields events; progress and
+# file-history-snapshot lines (the bulk of a transcript) have no entry.
+_PARSERS: dict[str, Callable[[dict, str, str], list[ParsedEvent]]] = {
+    "assistant": _parse_assistant,
+    "user": _parse_user,
+    "system": _parse_system,
+}
 
-    if event.event_type == EventType.TOOL_RESULT:
-        if event.is_error:
-            return f"❌ Erreur: {event.content}"
-        return None  # Don't spam tool results
 
-    if event.event_type == EventType.SYSTEM:
-        return None  # System messages are internal
+def parse_jsonl_line(line: str | bytes) -> list[ParsedEvent]:
+    """Parse a single JSONL line (text or raw UTF-8 bytes) into zero or more events."""
+    line = line.strip()
+    if not line:
+        return []
+
+    try:
+        data = fastjson.loads(line)
+    except fastjson.JSONDecodeError:
+        return []
+
+    parser = _PARSERS.get(data.get("type", ""))
+    if parser is None:
+        return []
+    return parser(data, data.get("uuid", ""), data.get("timestamp", ""))
+
+
+def _format_text(event: ParsedEvent) -> str | None:
+    return event.content
+
+
+def _format_tool_use(event: ParsedEvent) -> str | None:
+    if event.tool_input_summary:
+        return f"🔧 **{event.tool_name}**({event.tool_input_summary})"
+    return f"🔧 **{event.tool_name}**"
 
-    return None
+
+def _format_tool_result(event: ParsedEvent) -> str | None:
+    if event.is_error:
+        return f"❌ Erreur: {event.content}"
+    return None  # Don't spam tool results
+
+
+# One formatter per displayable event type; SYSTEM, THINKING and PROGRESS
+# are internal and have no entry.
+_FORMATTERS: dict[EventType, Callable[[ParsedEvent], str | None]] = {
+    EventType.TEXT: _format_text,
+    EventType.TOOL_USE: _format_tool_use,
+    EventType.TOOL_RESULT: _format_tool_result,
+}
+
+
+def format_event_for_telegram(event: ParsedEvent) -> str | None:
+    """Format a parsed event into a Telegram-friendly string.
+
+    Returns None if the event should not be displayed.
+    """
+    formatter = _FORMATTERS.get(event.event_type)
+    return formatter(event) if formatter else None
 
 
 def _truncate(s: str, max_len: int) -> str:
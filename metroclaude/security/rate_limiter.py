@@ -1,6 +1,6 @@
 """Simple rate limiting — per-user message rate + per-window tmux flood guard.
 
-P1-SEC5: Max messages per minute per user (sliding window).
+P1-SEC5: Max messages per minute per user (lazily refilled token bucket).
 P1-SEC6: Min interval between sends to the same tmux window.
 
 Lightweight alternative to RichardAtCT's token bucket — just what we need
@@ -29,27 +29,27 @@ class RateLimiter:
     ) -> None:
         self._max_per_minute = max_per_minute
         self._tmux_min_interval = tmux_min_interval
-        self._user_timestamps: dict[int, list[float]] = {}
+        # user_id -> (last refill, tokens); refilled on read, no timer
+        self._user_buckets: dict[int, tuple[float, float]] = {}
+        self._refill_per_sec = max_per_minute / 60.0
         self._tmux_last_send: dict[str, float] = {}
 
     def check_user_rate(self, user_id: int) -> bool:
         """Check if user can send a message.
 
         Returns True if allowed, False if rate limited.
-        Automatically cleans up timestamps older than 60s.
+        Each user has a bucket of max_per_minute tokens refilled at
+        max_per_minute per 60s, computed from the time since the last check.
         """
         now = time.monotonic()
-        ts = self._user_timestamps.setdefault(user_id, [])
-        # Remove old timestamps (older than 60s)
-        ts[:] = [t for t in ts if now - t < 60]
-        if len(ts) >= self._max_per_minute:
-            logger.warning(
-                "Rate limited user %d: %d messages in last 60s",
-                user_id,
-                len(ts),
-            )
+        cap = self._max_per_minute
+        last, tokens = self._user_buckets.get(user_id, (now, float(cap)))
+        tokens = min(cap, tokens + (now - last) * self._refill_per_sec)
+        if tokens < 1.0:
+            self._user_buckets[user_id] = (now, tokens)
+            logger.warning("Rate limited user %d: over %d messages/min", user_id, cap)
             return False
-        ts.append(now)
+        self._user_buckets[user_id] = (now, tokens - 1.0)
         return True
 
     def check_tmux_flood(self, window_name: str) -> bool:
@@ -13,11 +13,12 @@ import time
 from dataclasses import asdict, dataclass
 
 from .config import get_settings
+from .utils.fsio import fsync_dir
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionInfo:
     """State for one Telegram topic ↔ Claude session binding."""
 
@@ -41,7 +42,7 @@ class SessionInfo:
         self.last_active = time.time()
 
 
-@dataclass
+@dataclass(slots=True)
 class RecentSession:
     """Lightweight reference to a past session for /resume UI."""
 
@@ -60,6 +61,10 @@ class SessionManager:
         self._settings = get_settings()
         self._state_file = self._settings.state_dir / "state.json"
         self._sessions: dict[str, SessionInfo] = {}  # key = "chatid:topicid"
+        # Secondary indexes: claude_session_id (JSONL dispatch) and
+        # window_name (status polling, callbacks) -> SessionInfo
+        self._by_claude_id: dict[str, SessionInfo] = {}
+        self._by_window: dict[str, SessionInfo] = {}
         self._recent: list[RecentSession] = []
         self._load()
 
@@ -93,7 +98,11 @@ class SessionManager:
             working_dir=working_dir,
             is_running=True,
         )
+        replaced = self._sessions.get(key)
+        if replaced:
+            self._unindex(replaced, window=True)
         self._sessions[key] = info
+        self._by_window[window_name] = info
         self._save()
         logger.info("Session created: %s → window '%s'", key, window_name)
         return info
@@ -106,13 +115,18 @@ class SessionManager:
     ) -> None:
         info = self.get(chat_id, topic_id)
         if info:
+            self._unindex(info)
             info.claude_session_id = claude_session_id
+            if claude_session_id:
+                self._by_claude_id[claude_session_id] = info
             info.touch()
             self._save()
 
     def remove(self, chat_id: int, topic_id: int) -> SessionInfo | None:
         key = self._key(chat_id, topic_id)
         info = self._sessions.pop(key, None)
+        if info:
+            self._unindex(info, window=True)
         if info and info.claude_session_id:
             self._add_recent(
                 RecentSession(
@@ -129,16 +143,21 @@ class SessionManager:
         return list(self._sessions.values())
 
     def find_by_window(self, window_name: str) -> SessionInfo | None:
-        for info in self._sessions.values():
-            if info.window_name == window_name:
-                return info
-        return None
+        return self._by_window.get(window_name)
 
     def find_by_claude_session(self, claude_session_id: str) -> SessionInfo | None:
-        for info in self._sessions.values():
-            if info.claude_session_id == claude_session_id:
-                return info
-        return None
+        return self._by_claude_id.get(claude_session_id)
+
+    def _unindex(self, info: SessionInfo, *, window: bool = False) -> None:
+        """Drop *info* from the secondary indexes (where it is the indexed entry).
+
+        The window index is only touched when *window* is set, since a
+        Claude session rebind keeps the same window.
+        """
+        if self._by_claude_id.get(info.claude_session_id) is info:
+            del self._by_claude_id[info.claude_session_id]
+        if window and self._by_window.get(info.window_name) is info:
+            del self._by_window[info.window_name]
 
     # P1-S4: Clear session by window name
     def clear_window_session(self, window_name: str) -> SessionInfo | None:
@@ -146,9 +165,9 @@ class SessionManager:
 
         Returns the removed SessionInfo, or None if not found.
         """
-        for _key, info in list(self._sessions.items()):
-            if info.window_name == window_name:
-                return self.remove(info.chat_id, info.topic_id)
+        info = self._by_window.get(window_name)
+        if info:
+            return self.remove(info.chat_id, info.topic_id)
         return None
 
     # ------------------------------------------------------------------
@@ -216,6 +235,7 @@ class SessionManager:
                 except OSError:
                     pass
                 raise
+            fsync_dir(self._state_file.parent)
         except OSError as e:
             logger.error("Failed to save state: %s", e)
 
@@ -225,7 +245,11 @@ class SessionManager:
         try:
             data = json.loads(self._state_file.read_text())
             for k, v in data.get("sessions", {}).items():
-                self._sessions[k] = SessionInfo(**v)
+                info = SessionInfo(**v)
+                self._sessions[k] = info
+                self._by_window[info.window_name] = info
+                if info.claude_session_id:
+                    self._by_claude_id[info.claude_session_id] = info
             for r in data.get("recent", []):
                 self._recent.append(RecentSession(**r))
             logger.info(
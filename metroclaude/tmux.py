@@ -8,6 +8,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -22,6 +24,10 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Gap between a key and its Enter: sent back to back, Claude's Ink TUI can
+# read "y\r" as one input chunk and miss both
+_KEY_ENTER_DELAY = 0.1
+
 
 # ------------------------------------------------------------------
 # P1-T1+T7: TmuxWindow dataclass (pattern from ccbot)
@@ -45,6 +51,8 @@ class TmuxManager:
         self._server: libtmux.Server | None = None
         self._session: libtmux.Session | None = None
         self._settings = get_settings()
+        # Serializes multi-step sends per window (handlers run concurrently)
+        self._window_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -177,6 +185,7 @@ class TmuxManager:
                 logger.info("Killed window '%s'", window_name)
 
         await asyncio.to_thread(_kill)
+        self._window_locks.pop(window_name, None)
 
     async def list_windows(self) -> list[TmuxWindow]:
         """List all windows with enriched info (P1-T1+T7).
@@ -269,20 +278,48 @@ class TmuxManager:
         await asyncio.to_thread(_enter)
 
     async def send_keys_raw(self, window_name: str, keys: str) -> None:
-        """Send raw tmux key names (e.g. 'Escape', 'C-c', 'y')."""
+        """Send raw tmux key names (e.g. 'Escape', 'C-c', 'y').
+
+        Takes the window's lock so a key press can't land between another
+        message's text and its Enter.
+        """
         session = await self.ensure_session()
 
         def _send() -> None:
             _, pane = self._get_window_pane(session, window_name)
             pane.cmd("send-keys", keys)
 
-        await asyncio.to_thread(_send)
+        async with self._window_locks[window_name]:
+            await asyncio.to_thread(_send)
+
+    async def send_key_and_enter(self, window_name: str, key: str) -> None:
+        """Send a raw key, then Enter, as two separate send-keys.
+
+        The window/pane is resolved once for both, in a single thread hop,
+        and the window's lock is held across the pair so no message's text
+        or Enter can land between them.
+        """
+        session = await self.ensure_session()
+
+        def _send() -> None:
+            _, pane = self._get_window_pane(session, window_name)
+            pane.cmd("send-keys", key)
+            time.sleep(_KEY_ENTER_DELAY)
+            pane.enter()
+
+        async with self._window_locks[window_name]:
+            await asyncio.to_thread(_send)
 
     async def send_message(self, window_name: str, text: str) -> None:
-        """Send a complete message: text + Enter, with delay between."""
-        await self.send_text(window_name, text)
-        await asyncio.sleep(0.5)  # Let Claude process the text before Enter
-        await self.send_enter(window_name)
+        """Send a complete message: text + Enter, with delay between.
+
+        Holds the window's lock so concurrent senders can't interleave
+        their text and Enter keystrokes.
+        """
+        async with self._window_locks[window_name]:
+            await self.send_text(window_name, text)
+            await asyncio.sleep(0.5)  # Let Claude process the text before Enter
+            await self.send_enter(window_name)
 
     # ------------------------------------------------------------------
     # Output — capture terminal content
@@ -319,6 +356,30 @@ class TmuxManager:
 
         return await asyncio.to_thread(_cmd)
 
+    async def get_pane_commands(self) -> dict[str, str]:
+        """Map every window name to its active pane's foreground command.
+
+        One ``tmux list-panes`` call for the whole session, so status polling
+        doesn't need a get_pane_current_command() round-trip per window.
+        """
+        session = await self.ensure_session()
+
+        def _list() -> dict[str, str]:
+            result = session.cmd(
+                "list-panes",
+                "-s",
+                "-F",
+                "#{pane_active}\t#{pane_current_command}\t#{window_name}",
+            )
+            commands: dict[str, str] = {}
+            for line in result.stdout:
+                parts = line.split("\t", 2)
+                if len(parts) == 3 and parts[0] == "1":
+                    commands[parts[2]] = parts[1]
+            return commands
+
+        return await asyncio.to_thread(_list)
+
     async def get_pane_pid(self, window_name: str) -> int | None:
         """Get the PID of the process running in a window's pane."""
         session = await self.ensure_session()
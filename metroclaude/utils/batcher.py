@@ -0,0 +1,119 @@
+"""Input batcher — coalesce bursts of Telegram messages into one tmux send.
+
+Telegram clients split a long paste into several messages that arrive a
+few milliseconds apart. Each would otherwise cost its own send-keys
+round-trip (and trip the per-window flood guard), so messages for the
+same window within a short window are joined with newlines and sent once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from ..security.input_sanitizer import DEFAULT_MAX_LENGTH
+
+logger = logging.getLogger(__name__)
+
+# Default delay before a batch is flushed (seconds)
+DEFAULT_BATCH_DELAY = 0.2
+
+# send_fn(window_name, text) -> None
+SendFn = Callable[[str, str], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class _Batch:
+    future: asyncio.Future[None]
+    timer: asyncio.TimerHandle
+    parts: list[str] = field(default_factory=list)
+    size: int = 0  # chars once joined
+
+
+class MessageBatcher:
+    """Per-window batches flushed after *delay* or once *max_chars* would be exceeded.
+
+    ``enqueue`` returns a future that resolves when the batch holding the
+    message has been sent (or raises the send error), so callers can still
+    report failures per message.
+    """
+
+    def __init__(
+        self,
+        send_fn: SendFn,
+        *,
+        delay: float = DEFAULT_BATCH_DELAY,
+        max_chars: int = DEFAULT_MAX_LENGTH,
+    ) -> None:
+        self._send_fn = send_fn
+        self._delay = delay
+        self._max_chars = max_chars
+        self._pending: dict[str, _Batch] = {}
+        self._sending: dict[str, asyncio.Future[None]] = {}  # latest flushed batch per window
+        self._tasks: set[asyncio.Task] = set()  # in-flight sends (strong refs)
+
+    def is_pending(self, window_name: str) -> bool:
+        """True if a batch for *window_name* is waiting to be flushed."""
+        return window_name in self._pending
+
+    def would_join(self, window_name: str, text: str) -> bool:
+        """True if *text* would be appended to an open batch rather than start a new send."""
+        batch = self._pending.get(window_name)
+        return batch is not None and batch.size + 1 + len(text) <= self._max_chars
+
+    def enqueue(self, window_name: str, text: str) -> asyncio.Future[None]:
+        """Add *text* to the window's batch, starting one if needed."""
+        batch = self._pending.get(window_name)
+        if batch and not self.would_join(window_name, text):
+            self._flush(window_name)
+            batch = None
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = _Batch(
+                future=loop.create_future(),
+                timer=loop.call_later(self._delay, self._flush, window_name),
+            )
+            self._pending[window_name] = batch
+        else:
+            batch.size += 1  # joining newline
+        batch.parts.append(text)
+        batch.size += len(text)
+        return batch.future
+
+    async def flush(self, window_name: str) -> None:
+        """Send the window's open batch now and wait until its sends are done.
+
+        Lets a direct send (e.g. a forwarded command) keep per-window order.
+        Send errors are reported to the batch's own callers, not raised here.
+        """
+        self._flush(window_name)
+        future = self._sending.get(window_name)
+        if future is not None:
+            await asyncio.wait([future])
+
+    def _flush(self, window_name: str) -> None:
+        batch = self._pending.pop(window_name, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        self._sending[window_name] = batch.future
+        batch.future.add_done_callback(lambda f: self._sent(window_name, f))
+        task = asyncio.create_task(self._send_batch(window_name, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _sent(self, window_name: str, future: asyncio.Future[None]) -> None:
+        if self._sending.get(window_name) is future:
+            del self._sending[window_name]
+
+    async def _send_batch(self, window_name: str, batch: _Batch) -> None:
+        if len(batch.parts) > 1:
+            logger.debug("Batched %d messages for '%s'", len(batch.parts), window_name)
+        try:
+            await self._send_fn(window_name, "\n".join(batch.parts))
+        except Exception as e:
+            batch.future.set_exception(e)
+        else:
+            batch.future.set_result(None)
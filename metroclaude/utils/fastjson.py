@@ -0,0 +1,56 @@
+"""JSON via orjson when available (optional ``fast`` extra).
+
+``loads`` accepts str or bytes (invalid UTF-8 is decoded with replacement
+characters) and ``dumps`` returns UTF-8 bytes either way; the stdlib
+fallback keeps the bot working without the extra installed.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError  # orjson's error subclasses it
+
+
+def _loads_stdlib(data: str | bytes | bytearray) -> Any:
+    if not isinstance(data, str):
+        data = bytes(data).decode("utf-8", errors="replace")
+    return json.loads(data)
+
+
+if orjson is not None:
+
+    def loads(data: str | bytes | bytearray) -> Any:
+        """Parse *data* with orjson, deferring to stdlib json on rejection.
+
+        orjson refuses lone surrogate escapes (``"\\ud83d"``, written by JS when
+        a string is cut mid-emoji) and invalid UTF-8; both used to parse.
+        """
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return _loads_stdlib(data)
+
+else:
+    loads = _loads_stdlib
+
+
+def dumps(obj: object, *, pretty: bool = False) -> bytes:
+    """Encode *obj* compactly, or with 2-space indentation if *pretty*."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except orjson.JSONEncodeError:
+            pass  # e.g. lone surrogates: stdlib escapes them
+    if pretty:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+__all__ = ["JSONDecodeError", "dumps", "loads"]
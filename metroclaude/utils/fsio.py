@@ -0,0 +1,29 @@
+"""Filesystem helpers for the atomic temp-file + os.replace() writes."""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def fsync_dir(path: Path) -> None:
+    """Fsync directory *path* so a rename inside it survives a crash.
+
+    os.replace() is atomic but only durable once the directory entry is
+    flushed. Best effort: the file is already in place, so a failure is
+    logged rather than raised. No-op where directories cannot be opened
+    (Windows).
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.warning("Failed to fsync directory %s: %s", path, e)
@@ -11,6 +11,7 @@ Key improvements over defaults:
 
 from __future__ import annotations
 
+import functools
 import logging
 import re
 
@@ -142,6 +143,7 @@ def _markdownify(text: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=256)
 def to_telegram(
     text: str,
     *,
@@ -159,6 +161,9 @@ def to_telegram(
         ``(formatted_text, parse_mode)`` where *parse_mode* is
         ``"MarkdownV2"`` when conversion succeeds, or ``""`` for plain text
         fallback.
+
+    Results are memoized (pure function of its arguments): tool_use lines
+    and the edit-after-send path often convert the same text again.
     """
     if not text:
         return "", ""
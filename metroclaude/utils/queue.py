@@ -36,7 +36,7 @@ class TaskType(StrEnum):
     STATUS_CLEAR = "status_clear"  # Clear status message
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageTask:
     """A unit of work for the message queue."""
 
@@ -61,6 +61,10 @@ DeleteFn = Callable[[int, int, int | None], Awaitable[None]]
 class MessageQueue:
     """Per-chat message queue with task-type routing, tool editing, and rate limiting.
 
+    Each chat/topic gets its own worker task: sends are ordered within a
+    chat but run concurrently across chats, and a rate-limit backoff only
+    stalls the chat that hit it.
+
     Constructor takes three async callables:
         send_fn(chat_id, text, thread_id) -> message_id | None
         edit_fn(chat_id, message_id, text, thread_id) -> None
@@ -105,6 +109,15 @@ class MessageQueue:
             if key not in self._workers or self._workers[key].done():
                 self._workers[key] = asyncio.create_task(self._worker(key))
 
+    async def enqueue_many(self, tasks: list[MessageTask]) -> None:
+        """Add a batch of tasks, in order, taking the queue lock once."""
+        async with self._lock:
+            for task in tasks:
+                key = self._key(task.chat_id, task.thread_id)
+                self._queues[key].append(task)
+                if key not in self._workers or self._workers[key].done():
+                    self._workers[key] = asyncio.create_task(self._worker(key))
+
     # ------------------------------------------------------------------
     # Worker loop
     # ------------------------------------------------------------------
@@ -168,7 +181,13 @@ class MessageQueue:
             except Exception as e:
                 retry_after = getattr(e, "retry_after", None)
                 if retry_after:
-                    logger.warning("Rate limited, retrying in %ds", retry_after)
+                    # Still rate limited after _send_with_retry's attempts: only
+                    # this chat's worker backs off, and the task (trimmed to what
+                    # was not sent) goes back to the head of its queue so
+                    # per-chat order is preserved.
+                    logger.warning("Rate limited, requeued, retrying in %ds", retry_after)
+                    async with self._lock:
+                        self._queues[key].insert(0, task)
                     await asyncio.sleep(retry_after)
                 else:
                     logger.error("Error processing %s task: %s", task.task_type, e)
@@ -178,11 +197,19 @@ class MessageQueue:
     # ------------------------------------------------------------------
 
     async def _process_content(self, task: MessageTask) -> None:
-        """Send a regular text message. Split if over Telegram limit."""
+        """Send a regular text message. Split if over Telegram limit.
+
+        If a chunk stays rate limited, *task* is trimmed to the unsent chunks
+        before the error propagates, so a requeue never resends a chunk.
+        """
         chunks = self._split_message(task.text)
-        for chunk in chunks:
-            msg_id = await self._send_with_retry(task.chat_id, chunk, task.thread_id)
-            logger.info(
+        for i, chunk in enumerate(chunks):
+            try:
+                msg_id = await self._send_with_retry(task.chat_id, chunk, task.thread_id)
+            except Exception:
+                task.text = "\n".join(chunks[i:])
+                raise
+            logger.debug(
                 "Sent CONTENT → chat %d (msg_id=%s, %d chars)",
                 task.chat_id,
                 msg_id,
@@ -194,8 +221,9 @@ class MessageQueue:
         msg_id = await self._send_with_retry(task.chat_id, task.text, task.thread_id)
         if msg_id and task.tool_id:
             self._tool_msg_ids[task.tool_id] = msg_id
-        tid = task.tool_id[:8] if task.tool_id else "?"
-        logger.info("Sent TOOL_USE → chat %d (msg_id=%s, tool=%s)", task.chat_id, msg_id, tid)
+        if logger.isEnabledFor(logging.DEBUG):
+            tid = task.tool_id[:8] if task.tool_id else "?"
+            logger.debug("Sent TOOL_USE → chat %d (msg_id=%s, tool=%s)", task.chat_id, msg_id, tid)
 
     async def _process_tool_result(self, task: MessageTask) -> None:
         """Edit the matching tool_use message with the result, or send new on error."""
@@ -204,7 +232,8 @@ class MessageQueue:
             await self._send_with_retry(task.chat_id, task.text, task.thread_id)
             return
 
-        msg_id = self._tool_msg_ids.pop(task.tool_id, None)
+        # Popped only once handled, so a rate-limited retry can still edit it
+        msg_id = self._tool_msg_ids.get(task.tool_id)
         if msg_id is None:
             # No matching tool_use message found — skip silently
             logger.debug("No tool_use message for tool_id=%s, skipping result", task.tool_id)
@@ -213,17 +242,19 @@ class MessageQueue:
         # Edit the tool_use message to show the result
         try:
             await self._edit_fn(task.chat_id, msg_id, task.text, task.thread_id)
-            tid = task.tool_id[:8] if task.tool_id else "?"
-            logger.info(
-                "Edited TOOL_RESULT → chat %d (msg_id=%d, tool=%s)",
+            logger.debug(
+                "Edited TOOL_RESULT → chat %d (msg_id=%d, tool=%.8s)",
                 task.chat_id,
                 msg_id,
-                tid,
+                task.tool_id,
             )
         except Exception as e:
+            if getattr(e, "retry_after", None):
+                raise  # Requeued by the worker; retry the edit, not a new message
             logger.warning("Failed to edit tool message %d: %s — sending new", msg_id, e)
             # Fallback: send as new message
             await self._send_with_retry(task.chat_id, task.text, task.thread_id)
+        self._tool_msg_ids.pop(task.tool_id, None)
 
     async def _process_status(self, task: MessageTask) -> None:
         """Send or update a status message (one per chat)."""
@@ -265,13 +296,19 @@ class MessageQueue:
         thread_id: int | None,
         max_retries: int = 3,
     ) -> int | None:
-        """Send with exponential backoff on rate limit. Returns message_id."""
+        """Send with exponential backoff on rate limit. Returns message_id.
+
+        A rate limit (``retry_after``) on the last attempt is re-raised so the
+        worker can requeue the task; other errors give up and return None.
+        """
         for attempt in range(max_retries):
             try:
                 return await self._send_fn(chat_id, text, thread_id)
             except Exception as e:
                 retry_after = getattr(e, "retry_after", None)
                 if retry_after:
+                    if attempt == max_retries - 1:
+                        raise
                     logger.warning("Rate limited, retrying in %ds", retry_after)
                     await asyncio.sleep(retry_after)
                 elif attempt < max_retries - 1:
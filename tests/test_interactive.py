@@ -6,6 +6,7 @@ from metroclaude.handlers.callback_data import (
     CB_PERMIT_YES,
     CB_REFRESH,
     CB_RESTART,
+    CB_RESUME,
     decode_callback,
     encode_callback,
 )
@@ -53,6 +54,17 @@ def test_encode_truncation():
     assert len(window) > 0
 
 
+def test_encode_decode_resume():
+    """Resume callbacks carry a full Claude session ID within 64 bytes."""
+    session_id = "0b5c5a3e-1f2d-4c6b-9a8e-7d6f5e4c3b2a"
+    data = encode_callback(CB_RESUME, session_id)
+    assert len(data.encode()) <= 64
+    prefix, payload, index = decode_callback(data)
+    assert prefix == CB_RESUME
+    assert payload == session_id
+    assert index is None
+
+
 def test_decode_single_part():
     """Decode a callback with no colon separator."""
     prefix, window, index = decode_callback("xy")
@@ -140,6 +152,13 @@ def test_parse_numbered_options():
     assert options[2] == (2, "Third choice")
 
 
+def test_parse_options_max():
+    """Scanning stops once max_options have been found."""
+    content = "\n".join(f"{i}. Choice {i}" for i in range(1, 30))
+    options = parse_askuser_options(content, max_options=4)
+    assert [label for _, label in options] == ["Choice 1", "Choice 2", "Choice 3", "Choice 4"]
+
+
 def test_parse_no_options():
     """No parseable options returns empty list."""
     assert parse_askuser_options("Just a question, no options") == []
@@ -189,3 +208,30 @@ def test_interactive_tracker_get_msg_id():
     assert tracker.get_msg_id("win-1") == 99
     tracker.clear("win-1")
     assert tracker.get_msg_id("win-1") is None
+
+
+def test_static_keyboards_cached_per_window():
+    """Fixed-button keyboards are built once per window name."""
+    from metroclaude.handlers.interactive import build_permission_keyboard
+
+    assert build_permission_keyboard("win-a") is build_permission_keyboard("win-a")
+    assert build_permission_keyboard("win-a") is not build_permission_keyboard("win-b")
+
+
+def test_encode_truncation_counts_utf8_bytes():
+    """Non-ASCII names are cut to 64 UTF-8 bytes without splitting a character."""
+    data = encode_callback(CB_PERMIT_YES, "é" * 60)
+    assert len(data.encode("utf-8")) <= 64
+    prefix, window, _ = decode_callback(data)
+    assert prefix == CB_PERMIT_YES
+    assert window and set(window) == {"é"}
+
+
+def test_yesno_prefixes_bound_to_tmux_keys():
+    """Yes/no callbacks resolve their tmux key when the bot is built, not per press."""
+    from metroclaude.bot import MetroClaudeBot
+    from metroclaude.handlers.callback_data import PREFIX_TO_TMUX_KEY
+
+    bot = MetroClaudeBot()
+    for prefix, key in PREFIX_TO_TMUX_KEY.items():
+        assert bot._cb_dispatch[prefix].args == (key,)
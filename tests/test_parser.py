@@ -58,6 +58,28 @@ def test_parse_invalid_json():
     assert parse_jsonl_line("{invalid") == []
 
 
+def test_parse_raw_bytes():
+    line = _make_assistant_line({"type": "text", "text": "Hello world"}).encode()
+    events = parse_jsonl_line(line)
+    assert [e.content for e in events] == ["Hello world"]
+
+
+def test_parse_lone_surrogate_escape():
+    # JSON.stringify emits lone surrogates when a string is cut mid-emoji
+    line = _make_assistant_line({"type": "text", "text": "cut \ud83d"})
+    assert "\\ud83d" in line
+    for raw in (line, line.encode()):
+        events = parse_jsonl_line(raw)
+        assert [e.content for e in events] == ["cut \ud83d"]
+
+
+def test_parse_invalid_utf8_replaced():
+    line = _make_assistant_line({"type": "text", "text": "caf\u00e9"}).encode()
+    line = line.replace(b"\\u00e9", b"\xe9")  # Latin-1 byte, invalid UTF-8
+    events = parse_jsonl_line(line)
+    assert [e.content for e in events] == ["caf\ufffd"]
+
+
 def test_parse_tool_result():
     line = json.dumps({
         "type": "user",
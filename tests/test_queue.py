@@ -1,6 +1,7 @@
 """Tests for the message queue."""
 
 import asyncio
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -41,6 +42,22 @@ def _make_queue(
     return MessageQueue(mock_send, mock_edit, mock_delete)
 
 
+class _RetryAfter(Exception):
+    """Stand-in for telegram.error.RetryAfter (only ``retry_after`` is used)."""
+
+    retry_after = 0.01
+
+
+def _fast_settings(q: MessageQueue, max_len: int = 4096) -> None:
+    from types import SimpleNamespace
+
+    q._settings = SimpleNamespace(
+        message_merge_delay=0.01,
+        message_merge_max_length=3800,
+        telegram_max_message_length=max_len,
+    )
+
+
 # ---------------------------------------------------------------------------
 # _split_message tests (preserved from original)
 # ---------------------------------------------------------------------------
@@ -238,3 +255,237 @@ async def test_merge_guard_tool_use_breaks_merge():
     assert "A" in sent[0]["text"] and "B" in sent[0]["text"]
     assert sent[1]["text"] == "tool"
     assert sent[2]["text"] == "C"
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_preserves_order():
+    """enqueue_many should behave like sequential enqueue calls."""
+    sent = []
+    q = _make_queue(sent=sent)
+
+    await q.enqueue_many([
+        MessageTask(chat_id=100, thread_id=None, text="A"),
+        MessageTask(
+            chat_id=100, thread_id=None, text="tool",
+            task_type=TaskType.TOOL_USE, tool_id="t1",
+        ),
+        MessageTask(chat_id=100, thread_id=None, text="B"),
+    ])
+    await asyncio.sleep(2.0)
+
+    assert [m["text"] for m in sent] == ["A", "tool", "B"]
+
+
+@pytest.mark.asyncio
+async def test_chats_send_in_parallel():
+    """A slow send in one chat must not hold back another chat."""
+    other_sent = asyncio.Event()
+    sent = []
+
+    async def send(chat_id, text, thread_id):
+        if chat_id == 1:
+            # Only completes if chat 2 gets through while chat 1 is blocked
+            await asyncio.wait_for(other_sent.wait(), timeout=3)
+        else:
+            other_sent.set()
+        sent.append(chat_id)
+        return len(sent)
+
+    async def noop(*args):
+        return None
+
+    q = MessageQueue(send, noop, noop)
+    await q.enqueue(MessageTask(chat_id=1, thread_id=None, text="slow"))
+    await q.enqueue(MessageTask(chat_id=2, thread_id=None, text="fast"))
+    await asyncio.sleep(1.5)
+
+    assert sent == [2, 1]
+
+
+# ---------------------------------------------------------------------------
+# MessageBatcher (tmux input)
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_batcher_joins_burst_per_window():
+    """A burst for one window becomes one send; other windows are separate."""
+    from metroclaude.utils.batcher import MessageBatcher
+
+    sent = []
+
+    async def send(window, text):
+        sent.append((window, text))
+
+    b = MessageBatcher(send, delay=0.05, max_chars=12)
+    futs = [b.enqueue("w1", "one"), b.enqueue("w1", "two"), b.enqueue("w2", "x")]
+    assert b.is_pending("w1")
+    # Would exceed max_chars: flushes "one\ntwo" and starts a new batch
+    futs.append(b.enqueue("w1", "three33"))
+    await asyncio.gather(*futs)
+
+    assert sorted(sent) == [("w1", "one\ntwo"), ("w1", "three33"), ("w2", "x")]
+    assert not b.is_pending("w1")
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_send_error():
+    """Every message in a failed batch sees the send error."""
+    from metroclaude.utils.batcher import MessageBatcher
+
+    async def send(window, text):
+        raise RuntimeError("tmux gone")
+
+    b = MessageBatcher(send, delay=0.01)
+    futs = [b.enqueue("w", "a"), b.enqueue("w", "b")]
+    results = await asyncio.gather(*futs, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batcher_would_join_false_on_overflow():
+    """A message that would overflow the open batch starts a new send, not a join."""
+    from metroclaude.utils.batcher import MessageBatcher
+
+    async def send(window, text):
+        pass
+
+    b = MessageBatcher(send, delay=0.01, max_chars=12)
+    assert not b.would_join("w", "one")  # Nothing open yet
+    fut = b.enqueue("w", "one")
+    assert b.would_join("w", "two")
+    assert not b.would_join("w", "three3333")  # 3 + 1 + 9 > 12
+    await fut
+
+
+@pytest.mark.asyncio
+async def test_handle_text_flood_checks_every_new_send():
+    """Only messages appended to an open batch skip the tmux flood guard."""
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    from metroclaude.handlers import message
+    from metroclaude.utils.batcher import MessageBatcher
+
+    tmux_mgr = MagicMock()
+    tmux_mgr.send_message = AsyncMock()
+    rate_limiter = MagicMock()
+    rate_limiter.check_user_rate.return_value = True
+    rate_limiter.check_tmux_flood.return_value = True
+    session_mgr = MagicMock()
+    session_mgr.get.return_value = SimpleNamespace(window_name="w", touch=lambda: None)
+    context = SimpleNamespace(
+        bot_data={
+            "session_manager": session_mgr,
+            "tmux_manager": tmux_mgr,
+            "rate_limiter": rate_limiter,
+            "blocked_commands": frozenset(),
+            "message_batcher": MessageBatcher(tmux_mgr.send_message, delay=0.05, max_chars=12),
+        }
+    )
+
+    def update(text):
+        upd = MagicMock()
+        upd.message.text = text
+        upd.message.message_thread_id = 1
+        upd.message.reply_text = AsyncMock()
+        return upd
+
+    with patch.object(message, "check_auth", AsyncMock(return_value=True)):
+        await asyncio.gather(
+            *(
+                message.handle_text_message(update(t), context)
+                for t in ("one", "two", "three333")  # the third overflows the batch
+            )
+        )
+
+    assert rate_limiter.check_tmux_flood.call_count == 2
+    assert [c.args for c in tmux_mgr.send_message.await_args_list] == [
+        ("w", "one\ntwo"),
+        ("w", "three333"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_forwarded_command_waits_for_pending_batch():
+    """A /command sent right after text reaches the pane after that text."""
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    from metroclaude.handlers import message
+    from metroclaude.utils.batcher import MessageBatcher
+
+    sent = []
+
+    async def send_message(window, text):
+        await asyncio.sleep(0.01)
+        sent.append(text)
+
+    tmux_mgr = SimpleNamespace(send_message=send_message)
+    rate_limiter = MagicMock()
+    session_mgr = MagicMock()
+    session_mgr.get.return_value = SimpleNamespace(window_name="w", touch=lambda: None)
+    context = SimpleNamespace(
+        bot_data={
+            "session_manager": session_mgr,
+            "tmux_manager": tmux_mgr,
+            "rate_limiter": rate_limiter,
+            "blocked_commands": frozenset({"vim"}),
+            "message_batcher": MessageBatcher(send_message, delay=0.2),
+        }
+    )
+
+    def update(text):
+        upd = MagicMock()
+        upd.message.text = text
+        upd.message.message_thread_id = 1
+        upd.message.reply_text = AsyncMock()
+        return upd
+
+    with patch.object(message, "check_auth", AsyncMock(return_value=True)):
+        await asyncio.gather(
+            message.handle_text_message(update("fix the bug"), context),
+            message.handle_forward_command(update("/compact"), context),
+        )
+
+    assert sent == ["fix the bug", "/compact"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_task_requeued_after_retries():
+    """A task still rate limited after the send retries is requeued, not dropped."""
+    attempts = []
+
+    async def send(chat_id, text, thread_id):
+        attempts.append(text)
+        if len(attempts) <= 3:  # Exhausts _send_with_retry's three attempts
+            raise _RetryAfter()
+        return 1
+
+    q = MessageQueue(send, AsyncMock(), AsyncMock())
+    _fast_settings(q)
+    await q.enqueue(MessageTask(chat_id=1, thread_id=None, text="hello"))
+    await asyncio.sleep(0.3)
+
+    assert attempts == ["hello"] * 4
+
+
+@pytest.mark.asyncio
+async def test_requeued_split_content_skips_sent_chunks():
+    """Chunks that went out before the rate limit are not resent on requeue."""
+    sent = []
+    failures = {"n": 0}
+
+    async def send(chat_id, text, thread_id):
+        if text.startswith("B") and failures["n"] < 3:
+            failures["n"] += 1
+            raise _RetryAfter()
+        sent.append(text)
+        return len(sent)
+
+    q = MessageQueue(send, AsyncMock(), AsyncMock())
+    _fast_settings(q, max_len=10)
+    await q.enqueue(MessageTask(chat_id=1, thread_id=None, text="A" * 8 + "\n" + "B" * 8))
+    await asyncio.sleep(0.3)
+
+    assert sent == ["A" * 8, "B" * 8]
+
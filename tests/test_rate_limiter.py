@@ -35,13 +35,15 @@ def test_rate_limiter_per_user_isolation():
     assert rl.check_user_rate(456) is True   # User 456 still OK
 
 
-def test_rate_limiter_cleans_old_timestamps():
-    """Old timestamps (>60s) should be cleaned up."""
+def test_rate_limiter_refills_over_time():
+    """An empty bucket refills as time passes since the last check."""
     rl = RateLimiter(max_per_minute=2)
-    # Manually inject old timestamps
-    rl._user_timestamps[123] = [time.monotonic() - 120, time.monotonic() - 90]
-    # Should be cleaned, allowing new messages
+    # Manually inject an empty bucket last refilled 90s ago
+    rl._user_buckets[123] = (time.monotonic() - 90, 0.0)
+    # Fully refilled (capped at max_per_minute), allowing new messages
     assert rl.check_user_rate(123) is True
+    assert rl.check_user_rate(123) is True
+    assert rl.check_user_rate(123) is False
 
 
 # ------------------------------------------------------------------
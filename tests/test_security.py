@@ -264,6 +264,16 @@ def test_is_authorized_empty_whitelist():
         assert is_authorized(123) is False
 
 
+def test_allowed_user_ids_parsed_once():
+    """The whitelist is parsed into a set once per Settings instance."""
+    from metroclaude.config import Settings
+
+    settings = Settings(telegram_bot_token="x", allowed_users=" 123, 456,")
+    allowed = settings.get_allowed_user_ids()
+    assert allowed == frozenset({123, 456})
+    assert settings.get_allowed_user_ids() is allowed
+
+
 # ------------------------------------------------------------------
 # P2-SEC6: Audit logging (security/audit.py)
 # ------------------------------------------------------------------
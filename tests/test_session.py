@@ -3,7 +3,9 @@
 import json
 import time
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 from metroclaude.session import SessionInfo, SessionManager, RecentSession
 
@@ -90,6 +92,63 @@ def test_cleanup_stale_sessions_adds_to_recent():
         assert recent[0].session_id == "abc-123"
 
 
+# ------------------------------------------------------------------
+# claude_session_id index (find_by_claude_session)
+# ------------------------------------------------------------------
+
+def test_find_by_claude_session_uses_index():
+    """update_claude_session should make the session findable by its Claude ID."""
+    with patch.object(SessionManager, "_load"):
+        mgr = SessionManager()
+        mgr._sessions = {}
+        mgr._recent = []
+        info = mgr.create(100, 1, "win-a", "/tmp")
+        assert mgr.find_by_claude_session("abc-123") is None
+
+        mgr.update_claude_session(100, 1, "abc-123")
+        assert mgr.find_by_claude_session("abc-123") is info
+
+        # Rebinding drops the old ID
+        mgr.update_claude_session(100, 1, "def-456")
+        assert mgr.find_by_claude_session("abc-123") is None
+        assert mgr.find_by_claude_session("def-456") is info
+
+
+def test_find_by_claude_session_after_remove():
+    """Removed or replaced sessions should disappear from the index."""
+    with patch.object(SessionManager, "_load"):
+        mgr = SessionManager()
+        mgr._sessions = {}
+        mgr._recent = []
+        mgr.create(100, 1, "win-a", "/tmp")
+        mgr.update_claude_session(100, 1, "abc-123")
+        mgr.remove(100, 1)
+        assert mgr.find_by_claude_session("abc-123") is None
+
+        mgr.create(100, 2, "win-b", "/tmp")
+        mgr.update_claude_session(100, 2, "def-456")
+        mgr.create(100, 2, "win-b2", "/tmp")  # Replaces the topic's session
+        assert mgr.find_by_claude_session("def-456") is None
+
+
+def test_find_by_window_index():
+    """Window index follows create, replace and remove."""
+    with patch.object(SessionManager, "_load"):
+        mgr = SessionManager()
+        mgr._sessions = {}
+        mgr._recent = []
+        info = mgr.create(100, 1, "win-a", "/tmp")
+        mgr.update_claude_session(100, 1, "abc-123")
+        assert mgr.find_by_window("win-a") is info
+
+        replacement = mgr.create(100, 1, "win-b", "/tmp")
+        assert mgr.find_by_window("win-a") is None
+        assert mgr.find_by_window("win-b") is replacement
+
+        mgr.remove(100, 1)
+        assert mgr.find_by_window("win-b") is None
+
+
 # ------------------------------------------------------------------
 # P1-M2: mtime <= instead of ==
 # ------------------------------------------------------------------
@@ -103,6 +162,107 @@ def test_monitor_mtime_uses_lte():
     assert "== self._file.last_mtime" not in source
 
 
+def test_monitor_buffers_split_utf8_line(tmp_path):
+    """A line (and a UTF-8 char) split across writes is parsed once complete."""
+    import json
+    import os
+
+    from metroclaude.monitor import SessionMonitor
+
+    mon = SessionMonitor(session_id="s1", project_dir=tmp_path)
+    line = json.dumps(
+        {"type": "assistant", "message": {"content": [{"type": "text", "text": "café"}]}},
+        ensure_ascii=False,
+    ).encode() + b"\n"
+    cut = line.index("é".encode()) + 1  # mid-character
+    path = tmp_path / "s1.jsonl"
+
+    path.write_bytes(line[:cut])
+    assert mon.poll() == []
+
+    with open(path, "ab") as f:
+        f.write(line[cut:])
+    os.utime(path, (1e10, 1e10))
+    events = mon.poll()
+    assert [e.content for e in events] == ["café"]
+
+
+def test_monitor_pool_polls_all_in_one_pass(tmp_path):
+    """_poll_all returns only sessions with events; a failing monitor is isolated."""
+    from metroclaude.monitor import MonitorPool
+
+    pool = MonitorPool()
+    pool.add_session("ok", project_dir=tmp_path, skip_existing=False)
+    pool.add_session("idle", project_dir=tmp_path, skip_existing=False)
+    broken = pool.add_session("broken", project_dir=tmp_path, skip_existing=False)
+    broken.poll = MagicMock(side_effect=RuntimeError("boom"))
+    (tmp_path / "ok.jsonl").write_text(
+        '{"type": "assistant", "message": {"content": [{"type": "text", "text": "hi"}]}}\n'
+    )
+
+    results = pool._poll_all()
+    assert [(sid, [e.content for e in evs]) for sid, evs in results] == [("ok", ["hi"])]
+
+
+def test_monitor_pool_inotify_polls_only_changed(tmp_path):
+    """With inotify, only sessions whose JSONL was written are polled after the first pass."""
+    from collections import namedtuple
+
+    from metroclaude import monitor as monitor_mod
+
+    Event = namedtuple("Event", "wd mask cookie name")
+    fake = MagicMock()
+    fake.add_watch.return_value = 1
+    fake.read.return_value = []
+    pool = monitor_mod.MonitorPool()
+    pool._inotify = fake
+
+    a = pool.add_session("a", project_dir=tmp_path, skip_existing=False)
+    b = pool.add_session("b", project_dir=tmp_path, skip_existing=False)
+    fake.add_watch.assert_called_once_with(tmp_path, monitor_mod._WATCH_MASK)
+    a.poll = MagicMock(return_value=[])
+    b.poll = MagicMock(return_value=[])
+
+    pool._poll_all()  # Newly added sessions are polled once
+    assert (a.poll.call_count, b.poll.call_count) == (1, 1)
+
+    pool._poll_all()  # Nothing written
+    assert (a.poll.call_count, b.poll.call_count) == (1, 1)
+
+    fake.read.return_value = [Event(1, monitor_mod._IN_MODIFY, 0, "b.jsonl")]
+    pool._poll_all()
+    assert (a.poll.call_count, b.poll.call_count) == (1, 2)
+
+    fake.read.return_value = [Event(-1, monitor_mod._IN_Q_OVERFLOW, 0, "")]
+    pool._poll_all()  # Overflow: poll everything
+    assert (a.poll.call_count, b.poll.call_count) == (2, 3)
+
+
+def test_find_project_dir_prefers_derived_and_caches(tmp_path):
+    from types import SimpleNamespace
+
+    from metroclaude.monitor import MonitorPool
+
+    pool = MonitorPool()
+    pool._settings = SimpleNamespace(
+        claude_projects_dir=tmp_path, working_dir=Path("/home/u/my.proj")
+    )
+    derived = tmp_path / "-home-u-my-proj"
+    other = tmp_path / "other"
+    derived.mkdir()
+    other.mkdir()
+    (derived / "s1.jsonl").touch()
+    (other / "s2.jsonl").touch()
+
+    with patch.object(Path, "iterdir", side_effect=AssertionError("scanned")):
+        assert pool._find_project_dir("s1") == derived
+    assert pool._find_project_dir("s2") == other
+    assert pool._find_project_dir("s3") == derived  # JSONL pending
+
+    (other / "s2.jsonl").unlink()
+    assert pool._find_project_dir("s2") == other  # cached
+
+
 # ------------------------------------------------------------------
 # P1-S5: cleanup_stale_map_entries
 # ------------------------------------------------------------------
@@ -141,6 +301,200 @@ def test_cleanup_stale_map_entries(tmp_path):
         hooks_mod.SESSION_MAP_LOCK = original_lock
 
 
+@pytest.mark.asyncio
+async def test_wait_for_session_map_wakes_on_write(tmp_path, monkeypatch):
+    """/new should pick up the hook's entry shortly after it is written."""
+    import asyncio
+
+    import metroclaude.hooks as hooks_mod
+    from metroclaude.handlers.commands import _wait_for_session_map
+
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_FILE", tmp_path / "session_map.json")
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_LOCK", tmp_path / "session_map.lock")
+    hooks_mod.write_session_map({"metroclaude:other": {"session_id": "old"}})
+
+    async def hook():
+        await asyncio.sleep(0.3)
+        hooks_mod.write_session_map({"metroclaude:win": {"session_id": "sid-1"}})
+
+    writer = asyncio.create_task(hook())
+    start = time.monotonic()
+    assert await _wait_for_session_map("metroclaude:win", max_wait=5.0) == "sid-1"
+    assert time.monotonic() - start < 1.0
+    await writer
+
+
+def test_read_session_map_cached_until_rewrite(tmp_path, monkeypatch):
+    """Unchanged map is served from cache; callers get independent copies."""
+    import metroclaude.hooks as hooks_mod
+
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_FILE", tmp_path / "session_map.json")
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_LOCK", tmp_path / "session_map.lock")
+    hooks_mod.write_session_map({"metroclaude:a": {"session_id": "s1"}})
+
+    first = hooks_mod.read_session_map()
+    first.pop("metroclaude:a")
+    assert hooks_mod.read_session_map() == {"metroclaude:a": {"session_id": "s1"}}
+
+    hooks_mod.write_session_map({"metroclaude:b": {"session_id": "s2"}})
+    assert hooks_mod.read_session_map() == {"metroclaude:b": {"session_id": "s2"}}
+
+
+def test_cleanup_stale_map_entries_bare_key(tmp_path, monkeypatch):
+    """Keys without a session prefix are matched as bare window names."""
+    import metroclaude.hooks as hooks_mod
+
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_FILE", tmp_path / "session_map.json")
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_LOCK", tmp_path / "session_map.lock")
+    hooks_mod.write_session_map(
+        {
+            "metroclaude:alive": {"session_id": "s1"},
+            "metroclaude:dead": {"session_id": "s2"},
+            "bare": {"session_id": "s3"},
+        }
+    )
+    assert hooks_mod.cleanup_stale_map_entries({"alive", "bare"}) == 1
+    assert set(hooks_mod.read_session_map()) == {"metroclaude:alive", "bare"}
+
+
+def test_write_session_map_primes_read_cache(tmp_path, monkeypatch):
+    """The bot's own write is served back without re-parsing the file."""
+    import metroclaude.hooks as hooks_mod
+
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_FILE", tmp_path / "session_map.json")
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_LOCK", tmp_path / "session_map.lock")
+    written = {"metroclaude:a": {"session_id": "s1"}}
+    hooks_mod.write_session_map(written)
+    written.clear()  # caller's dict is not aliased by the cache
+
+    def fail(*args, **kwargs):
+        raise AssertionError("session map re-parsed")
+
+    monkeypatch.setattr(hooks_mod.fastjson, "loads", fail)
+    assert hooks_mod.read_session_map() == {"metroclaude:a": {"session_id": "s1"}}
+
+
+def test_map_lock_reopens_replaced_lock_file(tmp_path, monkeypatch):
+    """A deleted or recreated lock file is reopened, so the hook and bot share one inode."""
+    import os
+
+    import metroclaude.hooks as hooks_mod
+
+    lock = tmp_path / "session_map.lock"
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_LOCK", lock)
+    monkeypatch.setattr(hooks_mod, "_lock_fds", {})
+
+    def held_inode():
+        with hooks_mod._map_lock(hooks_mod.fcntl.LOCK_SH):
+            return os.fstat(hooks_mod._lock_fds[lock]).st_ino
+
+    first = held_inode()
+    assert held_inode() == first  # Cached while unchanged
+    lock.unlink()
+    assert held_inode() == lock.stat().st_ino  # Recreated on demand
+    lock.unlink()
+    lock.touch()
+    assert held_inode() == lock.stat().st_ino  # Replaced by someone else
+    os.close(hooks_mod._lock_fds.pop(lock))
+
+
+def test_write_session_map_dir_fsync_failure_not_fatal(tmp_path, monkeypatch, caplog):
+    """A failed directory fsync after the rename is a warning, not a failed write."""
+    import logging
+    import os
+
+    import metroclaude.hooks as hooks_mod
+
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_FILE", tmp_path / "session_map.json")
+    monkeypatch.setattr(hooks_mod, "SESSION_MAP_LOCK", tmp_path / "session_map.lock")
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        if os.path.isdir(f"/proc/self/fd/{fd}"):
+            raise OSError("EIO")
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+    with caplog.at_level(logging.WARNING):
+        hooks_mod.write_session_map({"metroclaude:a": {"session_id": "s1"}})
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+    assert "Failed to fsync directory" in caplog.text
+
+    monkeypatch.setattr(hooks_mod.fastjson, "loads", MagicMock(side_effect=AssertionError))
+    assert hooks_mod.read_session_map() == {"metroclaude:a": {"session_id": "s1"}}
+
+
+def test_hook_atomic_write_fsyncs_parent_dir(tmp_path):
+    """The hook's atomic write fsyncs the directory after the rename."""
+    import os
+
+    from metroclaude import hooks_session_start
+
+    target = str(tmp_path / "sub" / "session_map.json")
+    real_fsync = os.fsync
+    synced: list[bool] = []
+
+    def spy(fd):
+        synced.append(os.path.isdir(f"/proc/self/fd/{fd}"))
+        real_fsync(fd)
+
+    with patch.object(hooks_session_start.os, "fsync", spy):
+        hooks_session_start._atomic_write_json(target, {"k": 1})
+    assert json.loads(Path(target).read_text()) == {"k": 1}
+    assert synced == [False, True]  # temp file, then its directory
+
+
+def test_hook_skips_write_when_mapping_unchanged(tmp_path, monkeypatch):
+    """A re-fired SessionStart with the same mapping does not rewrite the map."""
+    import io
+
+    from metroclaude import hooks_session_start as hook
+
+    monkeypatch.setattr(hook, "SESSION_MAP_DIR", str(tmp_path))
+    monkeypatch.setattr(hook, "SESSION_MAP_FILE", str(tmp_path / "session_map.json"))
+    monkeypatch.setattr(hook, "SESSION_MAP_LOCK", str(tmp_path / "session_map.lock"))
+    monkeypatch.setenv("TMUX_PANE", "%7")
+    monkeypatch.setattr(hook.subprocess, "run", MagicMock(side_effect=OSError))
+    writes = MagicMock(wraps=hook._atomic_write_json)
+    monkeypatch.setattr(hook, "_atomic_write_json", writes)
+    payload = json.dumps({"session_id": "0123abcd-4567-89ab-cdef-0123456789ab", "cwd": "/w"})
+
+    for _ in range(2):
+        monkeypatch.setattr(hook.sys, "stdin", io.StringIO(payload))
+        hook.main()
+    assert writes.call_count == 1
+    assert "metroclaude:pane-7" in json.loads(Path(hook.SESSION_MAP_FILE).read_text())
+
+
+def test_hook_keeps_map_entries_orjson_rejects(tmp_path, monkeypatch):
+    """An existing map with a lone surrogate escape is extended, not replaced."""
+    import io
+
+    from metroclaude import hooks_session_start as hook
+
+    monkeypatch.setattr(hook, "SESSION_MAP_DIR", str(tmp_path))
+    monkeypatch.setattr(hook, "SESSION_MAP_FILE", str(tmp_path / "session_map.json"))
+    monkeypatch.setattr(hook, "SESSION_MAP_LOCK", str(tmp_path / "session_map.lock"))
+    monkeypatch.setenv("TMUX_PANE", "%7")
+    monkeypatch.setattr(hook.subprocess, "run", MagicMock(side_effect=OSError))
+    other = {"session_id": "s-other", "cwd": "/w/\ud83d", "window_name": "x"}
+    Path(hook.SESSION_MAP_FILE).write_text(json.dumps({"metroclaude:other": other}))
+
+    payload = json.dumps({"session_id": "0123abcd-4567-89ab-cdef-0123456789ab", "cwd": "/w"})
+    monkeypatch.setattr(hook.sys, "stdin", io.StringIO(payload))
+    hook.main()
+
+    data = json.loads(Path(hook.SESSION_MAP_FILE).read_text())
+    assert data["metroclaude:other"] == other
+    assert "metroclaude:pane-7" in data
+
+
+def test_fastjson_dumps_lone_surrogate():
+    from metroclaude.utils import fastjson
+
+    assert json.loads(fastjson.dumps({"t": "cut \ud83d"})) == {"t": "cut \ud83d"}
+
+
 # ------------------------------------------------------------------
 # P1-M1: Tool pairing (_pending_tools)
 # ------------------------------------------------------------------
@@ -151,3 +505,92 @@ def test_pending_tools_attribute_exists():
     bot = MetroClaudeBot()
     assert hasattr(bot, "_pending_tools")
     assert isinstance(bot._pending_tools, dict)
+
+
+def test_pending_tools_bounded():
+    """Unmatched tool_use entries are evicted oldest-first past the cap."""
+    from metroclaude import bot as bot_mod
+    bot = bot_mod.MetroClaudeBot()
+    for i in range(bot_mod._PENDING_TOOLS_MAX + 10):
+        bot._remember_tool("sess", f"tool-{i}", "text")
+    assert len(bot._pending_tools) == bot_mod._PENDING_TOOLS_MAX
+    assert "tool-0" not in bot._pending_tools
+    assert f"tool-{bot_mod._PENDING_TOOLS_MAX + 9}" in bot._pending_tools
+
+
+def test_pending_tools_forget_session():
+    """Removing a session drops only its pending tool_use entries."""
+    from metroclaude.bot import MetroClaudeBot
+    bot = MetroClaudeBot()
+    bot._remember_tool("a", "t1", "x")
+    bot._remember_tool("b", "t2", "y")
+    bot._forget_tools("a")
+    assert list(bot._pending_tools) == ["t2"]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_coalesces_text_events():
+    """Consecutive TEXT events become one CONTENT task; tools split the run."""
+    from metroclaude.bot import MetroClaudeBot
+    from metroclaude.parser import EventType, ParsedEvent
+    from metroclaude.utils.queue import TaskType
+
+    class FakeQueue:
+        def __init__(self):
+            self.tasks = []
+
+        async def enqueue_many(self, tasks):
+            self.tasks.extend(tasks)
+
+    bot = MetroClaudeBot()
+    with patch.object(SessionManager, "_load"):
+        bot._session_mgr = SessionManager()
+    bot._session_mgr._sessions = {}
+    bot._session_mgr._recent = []
+    bot._session_mgr.create(1, 2, "win", "/tmp")
+    bot._session_mgr.update_claude_session(1, 2, "sid")
+    bot._queue = FakeQueue()
+
+    await bot._dispatch_events("sid", [
+        ParsedEvent(EventType.TEXT, content="a"),
+        ParsedEvent(EventType.TEXT, content="b"),
+        ParsedEvent(EventType.TOOL_USE, tool_name="Read", tool_id="t1"),
+        ParsedEvent(EventType.TEXT, content="c"),
+    ])
+
+    types = [t.task_type for t in bot._queue.tasks]
+    assert types == [TaskType.CONTENT, TaskType.TOOL_USE, TaskType.CONTENT]
+    assert bot._queue.tasks[0].text == "a\n\nb"
+    assert bot._queue.tasks[2].text == "c"
+
+
+def test_status_backstop_backs_off_when_idle():
+    """Idle windows are re-checked less often; activity restores the base cadence."""
+    from metroclaude import bot as bot_mod
+    bot = bot_mod.MetroClaudeBot()
+    base = bot_mod._STATUS_POLL_BACKSTOP
+
+    # Recently active: due after the base backstop interval
+    bot._last_activity["w"] = 100.0
+    bot._last_checked["w"] = 100.0
+    assert bot._backstop_due("w", 100.0 + base, started=0.0)
+
+    # Idle for minutes: the base interval is no longer enough
+    bot._last_checked["w"] = 500.0
+    assert not bot._backstop_due("w", 500.0 + base, started=0.0)
+    assert bot._backstop_due("w", 500.0 + bot_mod._IDLE_BACKOFF_MAX, started=0.0)
+
+    # New JSONL output snaps back
+    with patch.object(bot_mod.time, "monotonic", return_value=505.0):
+        bot._mark_dirty("w")
+    assert bot._backstop_due("w", 500.0 + base, started=0.0)
+
+
+def test_hook_session_id_validation():
+    from metroclaude.hooks_session_start import _is_valid_session_id
+
+    sid = "0123abcd-4567-89ab-cdef-0123456789ab"
+    assert _is_valid_session_id(sid)
+    assert not _is_valid_session_id(sid + "\n")
+    assert not _is_valid_session_id(sid.upper())
+    assert not _is_valid_session_id(sid[:-1])
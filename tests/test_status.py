@@ -0,0 +1,129 @@
+"""Tests for terminal state detection in handlers/status.py."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from metroclaude.handlers import status
+from metroclaude.handlers.status import (
+    TypingManager,
+    detect_claude_exit,
+    detect_claude_prompt,
+    detect_interactive_ui,
+    detect_spinner,
+    parse_status_line,
+)
+
+# ------------------------------------------------------------------
+# Spinner / status line
+# ------------------------------------------------------------------
+
+
+def test_detect_spinner_in_last_lines():
+    """A spinner char in the last three lines means Claude is working."""
+    assert detect_spinner("output\n\n✻ Thinking…\n\n")
+    assert detect_spinner("a\nb\n⠋ running")
+
+
+def test_detect_spinner_ignores_older_lines():
+    """Spinner chars above the last three lines are stale."""
+    assert not detect_spinner("✻ done\nline 1\nline 2\nline 3")
+    assert not detect_spinner("")
+
+
+def test_parse_status_line_bottom_most():
+    """The bottom-most spinner line wins; text after the spinner is returned."""
+    terminal = "· Reading a.py\nsome output\n  ✳ Writing b.py  \n\n>"
+    assert parse_status_line(terminal) == "Writing b.py"
+    assert parse_status_line("no status here\n>") is None
+
+
+def test_tail_detection_on_large_capture():
+    """Only the bottom of a large capture is split, long lines included."""
+    history = "old output line\n" * 5000
+    assert detect_claude_prompt(history + "claude>\n\n")
+    assert detect_spinner(history + "✻ " + "x" * 10000)
+    assert not detect_spinner("✻\n" + "x" * 10000 + "\n" + "y" * 10000 + "\nz")
+
+
+# ------------------------------------------------------------------
+# Interactive UI detection
+# ------------------------------------------------------------------
+
+
+def test_detect_interactive_ui_needs_bottom_marker():
+    """Permission prompts are confirmed by a bottom marker on a later line."""
+    terminal = "output\n  Do you want to proceed?\n  ❯ 1. Yes\n    2. No\n\nEsc to cancel\n"
+    ui = detect_interactive_ui(terminal)
+    assert ui is not None
+    assert ui.name == "PermissionPrompt"
+    assert ui.content.startswith("  Do you want to proceed?")
+    assert detect_interactive_ui("output\nDo you want to proceed?") is None
+
+
+def test_detect_interactive_ui_askuser_without_bottom():
+    """AskUserQuestion matches below an unconfirmed marker of another kind."""
+    ui = detect_interactive_ui("Restore the code\n☐ Option A\n☐ Option B")
+    assert ui is not None
+    assert ui.name == "AskUserQuestion"
+    assert ui.content == "☐ Option A\n☐ Option B"
+
+
+# ------------------------------------------------------------------
+# TypingManager
+# ------------------------------------------------------------------
+
+
+async def test_typing_manager_single_pump(monkeypatch):
+    """Typing is sent after the debounce; all chats share one refresh task."""
+    monkeypatch.setattr(status, "_TYPING_DEBOUNCE", 0.01)
+    bot = MagicMock()
+    bot.send_chat_action = AsyncMock()
+    mgr = TypingManager(bot)
+    mgr.start_typing(1, None)
+    mgr.start_typing(2, 7)
+    mgr.start_typing(2, 7)  # already active: no extra send
+    pump = mgr._pump_task
+    await asyncio.sleep(0.05)
+
+    assert bot.send_chat_action.await_count == 2
+    bot.send_chat_action.assert_any_await(chat_id=2, action="typing", message_thread_id=7)
+    mgr.stop_typing(1)
+    mgr.start_typing(1)
+    assert mgr._pump_task is pump
+    mgr.stop_all()
+    await asyncio.sleep(0)
+    assert pump.done()
+
+
+async def test_typing_stopped_before_debounce_sends_nothing(monkeypatch):
+    """A reply arriving before the first send is due skips the API call."""
+    monkeypatch.setattr(status, "_TYPING_DEBOUNCE", 0.02)
+    bot = MagicMock()
+    bot.send_chat_action = AsyncMock()
+    mgr = TypingManager(bot)
+    mgr.start_typing(1, 5)
+    mgr.stop_typing(1, 5)
+    await asyncio.sleep(0.05)
+
+    bot.send_chat_action.assert_not_awaited()
+    mgr.stop_all()
+
+
+def test_detect_claude_exit():
+    """Only a known shell in the pane means Claude has exited."""
+    assert detect_claude_exit("zsh")
+    assert detect_claude_exit(" Bash\n")
+    assert not detect_claude_exit("node")
+    assert not detect_claude_exit("claude")
+    assert not detect_claude_exit("vim")
+    assert not detect_claude_exit(None)
+
+
+def test_detect_claude_prompt_patterns():
+    """Bare, named and project prompts match; tags and redirects do not."""
+    assert detect_claude_prompt("output\n  >  \n")
+    assert detect_claude_prompt("output\nclaude >")
+    assert detect_claude_prompt("a-very-long-project.name_01>")
+    assert not detect_claude_prompt("<div>")
+    assert not detect_claude_prompt("cat a >> b")
+    assert not detect_claude_prompt("this sentence is long and ends with >")
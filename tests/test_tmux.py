@@ -333,6 +333,123 @@ async def test_send_enter_uses_helper():
         await mgr.send_enter("nonexistent")
 
 
+@pytest.mark.asyncio
+async def test_send_message_serialized_per_window_only():
+    """Sends to one window keep text/Enter pairs together; windows run concurrently."""
+    mgr = _make_manager()
+    events = []
+
+    async def send_text(window_name, text):
+        events.append(("text", text))
+        await asyncio.sleep(0)
+
+    async def send_enter(window_name):
+        events.append(("enter", window_name))
+
+    mgr.send_text = send_text
+    mgr.send_enter = send_enter
+    await asyncio.gather(
+        mgr.send_message("a", "a1"),
+        mgr.send_message("a", "a2"),
+        mgr.send_message("b", "b1"),
+    )
+
+    assert events.index(("text", "b1")) < events.index(("enter", "a"))
+    a_events = [e for e in events if e[1] in ("a1", "a2", "a")]
+    assert a_events == [("text", "a1"), ("enter", "a"), ("text", "a2"), ("enter", "a")]
+
+
+@pytest.mark.asyncio
+async def test_send_keys_raw_waits_for_pending_message():
+    """A raw key press can't be sent between a message's text and its Enter."""
+    mgr = _make_manager()
+    session = MagicMock()
+    mgr._session = session
+    window = MagicMock()
+    session.windows.filter.return_value = [window]
+    events = []
+    real_sleep = asyncio.sleep
+
+    async def send_text(window_name, text):
+        events.append(("text", text))
+        await real_sleep(0.05)  # Window for the key press to sneak in
+
+    async def send_enter(window_name):
+        events.append(("enter", window_name))
+
+    mgr.send_text = send_text
+    mgr.send_enter = send_enter
+    window.active_pane.cmd.side_effect = lambda *args: events.append(("keys", args[1]))
+
+    with patch("metroclaude.tmux.asyncio.sleep", new=AsyncMock()):
+        await asyncio.gather(mgr.send_message("a", "hi"), mgr.send_keys_raw("a", "Escape"))
+    assert events == [("text", "hi"), ("enter", "a"), ("keys", "Escape")]
+
+
+@pytest.mark.asyncio
+async def test_send_key_and_enter_not_split_by_message():
+    """A button's key and Enter stay together around a concurrent send_message."""
+    mgr = _make_manager()
+    session = MagicMock()
+    mgr._session = session
+    window = MagicMock()
+    session.windows.filter.return_value = [window]
+    events = []
+    real_sleep = asyncio.sleep
+
+    async def send_text(window_name, text):
+        events.append(("text", text))
+        await real_sleep(0.01)
+
+    async def send_enter(window_name):
+        events.append(("enter", window_name))
+
+    mgr.send_text = send_text
+    mgr.send_enter = send_enter
+    window.active_pane.cmd.side_effect = lambda *args: events.append(("keys", args[1]))
+    window.active_pane.enter.side_effect = lambda: events.append(("enter", "key"))
+
+    with (
+        patch("metroclaude.tmux.asyncio.sleep", new=AsyncMock()),
+        patch("metroclaude.tmux._KEY_ENTER_DELAY", 0.05),
+    ):
+        await asyncio.gather(mgr.send_key_and_enter("a", "y"), mgr.send_message("a", "hi"))
+    assert events == [("keys", "y"), ("enter", "key"), ("text", "hi"), ("enter", "a")]
+
+
+@pytest.mark.asyncio
+async def test_send_keys_raw_sends_single_key():
+    """send_keys_raw sends only the given key; callers send Enter separately."""
+    mgr = _make_manager()
+    session = MagicMock()
+    mgr._session = session
+    pane = MagicMock()
+    window = MagicMock()
+    window.active_pane = pane
+    session.windows.filter.return_value = [window]
+
+    await mgr.send_keys_raw("test", "y")
+    pane.cmd.assert_called_once_with("send-keys", "y")
+
+
+@pytest.mark.asyncio
+async def test_send_key_and_enter_separate_sends_one_lookup():
+    """Key and Enter go out as two send-keys; the pane is resolved once."""
+    mgr = _make_manager()
+    session = MagicMock()
+    mgr._session = session
+    pane = MagicMock()
+    window = MagicMock()
+    window.active_pane = pane
+    session.windows.filter.return_value = [window]
+
+    with patch("metroclaude.tmux._KEY_ENTER_DELAY", 0):
+        await mgr.send_key_and_enter("test", "y")
+    pane.cmd.assert_called_once_with("send-keys", "y")
+    pane.enter.assert_called_once_with()
+    session.windows.filter.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_get_pane_current_command_returns_none():
     """get_pane_current_command should return None for missing window."""
@@ -345,6 +462,23 @@ async def test_get_pane_current_command_returns_none():
     assert result is None
 
 
+@pytest.mark.asyncio
+async def test_get_pane_commands_single_call():
+    """get_pane_commands should map windows to active pane commands in one tmux call."""
+    mgr = _make_manager()
+    session = MagicMock()
+    mgr._session = session
+    session.cmd.return_value.stdout = [
+        "1\tclaude\tproj1",
+        "0\tvim\tproj1",  # Inactive pane — ignored
+        "1\tzsh\tproj2",
+    ]
+
+    result = await mgr.get_pane_commands()
+    assert result == {"proj1": "claude", "proj2": "zsh"}
+    session.cmd.assert_called_once()
+
+
 # ------------------------------------------------------------------
 # Helper
 # ------------------------------------------------------------------